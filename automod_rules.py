@@ -0,0 +1,280 @@
+import re
+import unicodedata
+from collections import deque
+from functools import cached_property
+from cache import TTLCache
+
+# AutoMod rules. A guild's automod config is a list of rules, each a dict of
+# conditions (all must match) and actions:
+#
+#   {"name": "no-scam-links", "links": ["bit.ly", "discord.gift"], "mentions": 5,
+#    "actions": ["delete", "timeout"], "timeout": 600}
+#
+# Conditions:
+#   regex        pattern searched in the message (case-insensitive)
+#   words        list of substrings (matched against the normalized text)
+#   mentions     at least this many user/role mentions
+#   caps         at least this ratio of capital letters (messages with 8+ letters)
+#   links        list of domains, optionally with a path ("discord.com/invite")
+#   attachments  list of file extensions ("*" for any attachment)
+#   rate         [count, seconds]: count matching messages from one user within seconds
+#
+# Actions: delete, warn (DM `message`), timeout (`timeout` seconds), log.
+#
+# compile_plan() turns the config into an AutomodPlan once, when it changes.
+# Conditions are ordered cheapest first, so most messages are rejected after
+# an integer comparison; the word lists and link domains of every rule are
+# merged into one regex and one dict, so a message is scanned once no matter
+# how many rules use them. Per-message data (normalized text, links, ...) is
+# computed lazily on a MessageContext and shared by every check.
+
+CAPS_MIN_LETTERS = 8
+LINK_PATTERN = re.compile(r"(?:https?://)?((?:[a-z0-9-]+\.)+[a-z]{2,})(/[^\s>]*)?")
+INVISIBLE_CHARS = dict.fromkeys(map(ord, "\u00ad\u200b\u200c\u200d\u2060\ufeff"))
+INVITE_DOMAINS = ["discord.gg", "discord.com/invite", "discordapp.com/invite"]
+
+CONDITIONS = ("regex", "words", "mentions", "caps", "links", "attachments", "rate")
+ACTIONS = ("delete", "warn", "timeout", "log")
+
+def normalize(text):
+    """Casefolded text with compatibility forms folded and zero-width characters removed, so "ｎｕｋｅ" or "nu\u200bke" match "nuke"."""
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKC", text).casefold().translate(INVISIBLE_CHARS)
+
+class RuleError(ValueError):
+    """Raised for a rule that can't be compiled (unknown action, bad regex, no conditions...)."""
+
+class MessageContext:
+    """Per-message values shared by every automod/keyword check. Each one is computed on first use."""
+    def __init__(self, message):
+        self.message = message
+        self.content = message.content
+        self.memo = {}
+
+    @cached_property
+    def normalized(self):
+        return normalize(self.content)
+
+    @cached_property
+    def mention_count(self):
+        return len(self.message.raw_mentions) + len(self.message.raw_role_mentions)
+
+    @cached_property
+    def caps_ratio(self):
+        letters = upper = 0
+        for ch in self.content:
+            if ch.isalpha():
+                letters += 1
+                upper += ch.isupper()
+        return upper / letters if letters >= CAPS_MIN_LETTERS else 0.0
+
+    @cached_property
+    def links(self):
+        """(host, path) pairs for every link-looking token in the message."""
+        if "." not in self.content:
+            return ()
+        return tuple((m.group(1), m.group(2) or "") for m in LINK_PATTERN.finditer(self.normalized))
+
+    @cached_property
+    def attachment_exts(self):
+        return {a.filename.rsplit(".", 1)[-1].lower() for a in self.message.attachments if "." in a.filename}
+
+class Rule:
+    def __init__(self, index, spec):
+        self.index = index
+        self.spec = spec
+        self.name = spec.get("name", f"rule-{index + 1}")
+        self.actions = tuple(spec.get("actions", ("delete", "log")))
+        self.timeout = spec.get("timeout", 300)
+        self.message = spec.get("message") or f"Your message was blocked by the `{self.name}` rule."
+        self.log_action = spec.get("log_action", "automod_rule")
+        self.conditions = [] # (cost, check)
+
+def trie_pattern(words):
+    """Regex matching any of `words`, shaped as a trie so each position follows one path instead of trying every word."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {} # end of a word
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if "" in node else body
+    return build(trie)
+
+class AutomodPlan:
+    def __init__(self, specs, whitelist=()):
+        self.whitelist = frozenset(whitelist)
+        self.rules = []
+        word_rules = {}
+        self.domains = {} # host -> [(path prefix, rule index)]
+
+        for index, spec in enumerate(specs):
+            rule = Rule(index, spec)
+            unknown = [a for a in rule.actions if a not in ACTIONS]
+            if unknown:
+                raise RuleError(f"Unknown action(s) in `{rule.name}`: {', '.join(unknown)}")
+
+            if spec.get("mentions"):
+                limit = int(spec["mentions"])
+                rule.conditions.append((0, lambda ctx, limit=limit: ctx.mention_count >= limit))
+            if spec.get("attachments"):
+                exts = {e.lower().lstrip(".") for e in spec["attachments"]}
+                if "*" in exts:
+                    rule.conditions.append((1, lambda ctx: bool(ctx.message.attachments)))
+                else:
+                    rule.conditions.append((1, lambda ctx, exts=exts: bool(ctx.message.attachments) and not exts.isdisjoint(ctx.attachment_exts)))
+            if spec.get("caps"):
+                ratio = float(spec["caps"])
+                rule.conditions.append((3, lambda ctx, ratio=ratio: len(ctx.content) >= CAPS_MIN_LETTERS and ctx.caps_ratio >= ratio))
+            if spec.get("links"):
+                for domain in spec["links"]:
+                    host, _, path = domain.lower().removeprefix("https://").removeprefix("http://").partition("/")
+                    self.domains.setdefault(host, []).append(("/" + path if path else "", index))
+                rule.conditions.append((4, lambda ctx, index=index: index in self.link_hits(ctx)))
+            if spec.get("words"):
+                for word in spec["words"]:
+                    if word.strip():
+                        word_rules.setdefault(normalize(word.strip()), set()).add(index)
+                rule.conditions.append((5, lambda ctx, index=index: index in self.word_hits(ctx)))
+            if spec.get("regex"):
+                try:
+                    pattern = re.compile(spec["regex"], re.IGNORECASE)
+                except re.error as e:
+                    raise RuleError(f"Invalid regex in `{rule.name}`: {e}") from e
+                rule.conditions.append((6, lambda ctx, pattern=pattern: pattern.search(ctx.content) is not None))
+            if spec.get("rate"):
+                count, seconds = spec["rate"]
+                # Last on purpose: it counts messages that passed the other conditions
+                rule.conditions.append((10, RateCheck(count, seconds)))
+
+            if not rule.conditions:
+                raise RuleError(f"Rule `{rule.name}` has no conditions")
+            rule.conditions.sort(key=lambda c: c[0])
+            self.rules.append(rule)
+
+        # Rules whose first check is cheapest run first; a cheap rule rejecting costs almost nothing
+        self.rules.sort(key=lambda r: (r.conditions[0][0], r.index))
+        for order, rule in enumerate(self.rules):
+            rule.order = order
+        # Rules with a word or link condition are only candidates when the shared
+        # scan hit them, so keyword/domain rules cost nothing per rule on other messages
+        self.ungated = [r for r in self.rules if not (r.spec.get("words") or r.spec.get("links"))]
+        self.gated = {r.index: r for r in self.rules if r.spec.get("words") or r.spec.get("links")}
+
+        # Every word of every rule in one trie-shaped pattern (the longest word
+        # starting at a position wins), inside a lookahead so every start
+        # position is tried and overlapping words ("nuke" and "ukes" in
+        # "nukes") are all found. A match also counts for rules whose word is
+        # contained in the matched text.
+        self.word_pattern = None
+        self.word_rules = {}
+        if word_rules:
+            words = sorted(word_rules, key=len, reverse=True)
+            self.word_pattern = re.compile("(?=(" + trie_pattern(words) + "))")
+            for word in words:
+                self.word_rules[word] = set().union(*(rules for other, rules in word_rules.items() if other in word))
+
+    def word_hits(self, ctx):
+        hits = ctx.memo.get("words")
+        if hits is None:
+            hits = set()
+            for match in () if self.word_pattern is None else self.word_pattern.finditer(ctx.normalized):
+                hits |= self.word_rules[match.group(1)]
+            ctx.memo["words"] = hits
+        return hits
+
+    def link_hits(self, ctx):
+        hits = ctx.memo.get("links")
+        if hits is None:
+            hits = set()
+            for host, path in ctx.links:
+                # Check the host and each parent domain: a.b.example.com, b.example.com, example.com, ...
+                parts = host.split(".")
+                for i in range(len(parts) - 1):
+                    for prefix, index in self.domains.get(".".join(parts[i:]), ()):
+                        if path.startswith(prefix):
+                            hits.add(index)
+            ctx.memo["links"] = hits
+        return hits
+
+    def evaluate(self, ctx):
+        """The first rule whose conditions all match, or None."""
+        candidates = self.ungated
+        if self.gated:
+            hits = set()
+            if self.word_pattern:
+                hits |= self.word_hits(ctx)
+            if self.domains:
+                hits |= self.link_hits(ctx)
+            if hits:
+                candidates = sorted(self.ungated + [self.gated[i] for i in hits if i in self.gated], key=lambda r: r.order)
+        for rule in candidates:
+            for _, check in rule.conditions:
+                if not check(ctx):
+                    break
+            else:
+                return rule
+        return None
+
+class RateCheck:
+    """Matches once a user has sent `count` messages that reached this check within `seconds`."""
+    def __init__(self, count, seconds):
+        self.count = int(count)
+        self.seconds = float(seconds)
+        self.history = TTLCache(self.seconds, maxsize=10000)
+
+    def __call__(self, ctx):
+        now = ctx.message.created_at.timestamp()
+        user_id = ctx.message.author.id
+        times = self.history.get(user_id)
+        if times is None:
+            times = deque()
+        while times and now - times[0] >= self.seconds:
+            times.popleft()
+        times.append(now)
+        self.history.set(user_id, times)
+        return len(times) >= self.count
+
+def legacy_actions(value):
+    actions = {"warn": ["warn"], "delete": ["delete"], "both": ["delete", "warn"]}.get(value, ["delete"])
+    return actions + ["log"]
+
+def guild_rules(config):
+    """The rule list for a guild config, including the rules implied by the /automod presets and /keywordfilter."""
+    rules = []
+    if config.get("anti_invite"):
+        rules.append({
+            "name": "Anti-Invite", "links": INVITE_DOMAINS, "actions": legacy_actions(config["anti_invite"]),
+            "message": "Server invites are not allowed!", "log_action": "automod_invite"
+        })
+    if config.get("anti_spam"):
+        rules.append({
+            "name": "Anti-Spam", "rate": [6, 5], "actions": legacy_actions(config["anti_spam"]),
+            "message": "Please stop spamming!", "log_action": "automod_spam"
+        })
+    if config.get("keywords"):
+        rules.append({
+            "name": "Keyword Filter", "words": config["keywords"], "actions": ["delete", "warn", "log"],
+            "message": "Your message contained a filtered keyword.", "log_action": "keyword_filter"
+        })
+    if config.get("blacklist") and config.get("blacklisted_words"):
+        rules.append({
+            "name": "Blacklist", "words": config["blacklisted_words"], "actions": legacy_actions(config["blacklist"]),
+            "message": "Your message contained a blacklisted word!", "log_action": "automod_blacklist"
+        })
+    rules.extend(config.get("rules", []))
+    return rules
+
+def compile_plan(config):
+    """Compiles a guild's automod config. Returns None when there is nothing to check."""
+    rules = guild_rules(config)
+    if not rules:
+        return None
+    return AutomodPlan(rules, config.get("whitelist", ()))
@@ -0,0 +1,76 @@
+import os
+import json
+import hashlib
+import logging
+import discord
+
+# Slash command sync is a slow, rate-limited API call, so we only do it when
+# the command tree actually changed since the last successful sync. The hash
+# of the serialized tree is stored per application (and per dev guild) in
+# command_sync.json.
+#
+#   DEV_GUILD_IDS  comma separated guild IDs: sync there (instant) instead of globally
+#   FORCE_SYNC=1   sync even if the hash matches
+
+logger = logging.getLogger(__name__)
+
+SYNC_STATE_FILE = "command_sync.json"
+
+def tree_hash(tree, guild=None):
+    payload = [cmd.to_dict(tree) for cmd in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda c: (c.get("type", 1), c["name"]))
+    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+def load_sync_state():
+    try:
+        with open(SYNC_STATE_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_sync_state(state):
+    with open(SYNC_STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+def dev_guild_ids():
+    value = os.environ.get("DEV_GUILD_IDS", "")
+    return [int(part) for part in value.split(",") if part.strip()]
+
+async def sync_commands(bot, guild_ids=None, force=False):
+    """Syncs the command tree to `guild_ids` (default: DEV_GUILD_IDS, or globally if that is empty) if it changed.
+
+    Returns the list of targets that were actually synced.
+    """
+    force = force or os.environ.get("FORCE_SYNC") == "1"
+    state = load_sync_state()
+    app_state = state.setdefault(str(bot.application_id), {})
+
+    if guild_ids is None:
+        guild_ids = dev_guild_ids()
+    targets = []
+    if guild_ids:
+        for guild_id in guild_ids:
+            guild = discord.Object(id=guild_id)
+            bot.tree.copy_global_to(guild=guild)
+            targets.append((str(guild_id), guild))
+    else:
+        targets.append(("global", None))
+
+    synced = []
+    for key, guild in targets:
+        digest = tree_hash(bot.tree, guild)
+        if not force and app_state.get(key) == digest:
+            logger.info(f"Slash commands unchanged ({key}), skipping sync")
+            continue
+        try:
+            commands = await bot.tree.sync(guild=guild)
+            app_state[key] = digest
+            synced.append(key)
+            logger.info(f"Synced {len(commands)} slash commands ({key})")
+        except Exception as e:
+            logger.error(f"Failed to sync slash commands ({key}): {e}")
+
+    if synced:
+        save_sync_state(state)
+    return synced
@@ -0,0 +1,158 @@
+import os
+import json
+import asyncio
+import logging
+import discord
+from discord.ext import commands
+from startup import timer
+from http_client import HTTPClient
+from modlog import ModLog
+from listening_history import ListeningHistory
+from poll_store import PollStore
+from member_cache import member_cache_options, install as install_member_cache
+from interaction_guard import GuardedTree
+from rest_telemetry import RestMonitor
+
+logger = logging.getLogger(__name__)
+
+# Load tokens. The AI client itself is only built on first use (see features/ai.py).
+discord_token = os.environ.get('DISCORD_TOKEN')
+groq_api_key = os.environ.get('GROQ_API_KEY')
+perplexity_api_key = os.environ.get('PERPLEXITY_API_KEY')
+
+if not discord_token or not (groq_api_key or perplexity_api_key):
+    logger.error("Missing DISCORD_TOKEN or an AI key (GROQ_API_KEY / PERPLEXITY_API_KEY)")
+    exit(1)
+
+def get_prefix(bot, message):
+    if not message.guild:
+        return "$"
+    try:
+        with open("prefixes.json", "r") as f:
+            prefixes = json.load(f)
+        return prefixes.get(str(message.guild.id), "$")
+    except:
+        return "$"
+
+# REST telemetry has to hook discord.py's HTTP session when the bot is built
+rest_monitor = RestMonitor()
+
+# Bot setup
+intents = discord.Intents.default()
+intents.message_content = True
+intents.members = True # Required for serverinfo and userinfo
+
+member_cache_policy = os.environ.get('MEMBER_CACHE', 'full')
+bot_options = member_cache_options(member_cache_policy)
+
+def parse_shard_ids(value):
+    """Parses "0,1,2" or "0-3" (or a mix of both) into a sorted list of shard IDs."""
+    ids = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            ids.update(range(int(start), int(end) + 1))
+        else:
+            ids.add(int(part))
+    return sorted(ids)
+
+# Sharding: supervisor.py sets SHARD_COUNT/SHARD_IDS for each worker process.
+# SHARDED=1 alone lets discord.py ask Discord for the recommended shard count.
+shard_count = os.environ.get('SHARD_COUNT')
+shard_ids = os.environ.get('SHARD_IDS')
+
+if shard_count or shard_ids or os.environ.get('SHARDED') == '1':
+    bot = commands.AutoShardedBot(
+        command_prefix=get_prefix,
+        intents=intents,
+        shard_count=int(shard_count) if shard_count else None,
+        shard_ids=parse_shard_ids(shard_ids) if shard_ids else None,
+        tree_cls=GuardedTree,
+        http_trace=rest_monitor.trace_config,
+        **bot_options
+    )
+    logger.info(f"Sharded mode: shard_count={shard_count or 'auto'}, shard_ids={shard_ids or 'all'}")
+else:
+    bot = commands.Bot(command_prefix=get_prefix, intents=intents, tree_cls=GuardedTree, http_trace=rest_monitor.trace_config, **bot_options)
+
+if member_cache_policy == "lean":
+    install_member_cache(bot, int(os.environ.get('RECENT_MEMBERS_MAX', 5000)), int(os.environ.get('RECENT_MEMBERS_TTL', 300)))
+    logger.info("Member cache: lean (voice + recently active, no chunking at startup)")
+
+# Per-route REST usage, 429s and request priorities (see rest_telemetry.py)
+rest_monitor.install(bot.http)
+bot.rest = rest_monitor
+# Shared, pooled HTTP client + asset cache for all outbound fetches
+bot.http_client = HTTPClient()
+# Persistent moderation / anti-nuke event log
+bot.modlog = ModLog()
+bot.history = ListeningHistory()
+bot.poll_store = PollStore()
+
+def is_primary_process():
+    # Global work (slash command sync) only runs in the process that owns shard 0
+    return bot.shard_ids is None or 0 in bot.shard_ids
+
+def serves_guild(guild_id):
+    """Whether this process owns `guild_id`'s shard (None means DMs, which go to shard 0)."""
+    if bot.shard_ids is None or not bot.shard_count:
+        return True
+    shard_id = 0 if guild_id is None else (guild_id >> 22) % bot.shard_count
+    return shard_id in bot.shard_ids
+
+class InFlight:
+    """Counts running requests so shutdown can wait for them to finish."""
+    def __init__(self):
+        self.count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def __enter__(self):
+        self.count += 1
+        self._idle.clear()
+        return self
+
+    def __exit__(self, *exc):
+        self.count -= 1
+        if self.count == 0:
+            self._idle.set()
+
+    async def drain(self, timeout):
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+# Set by main.graceful_shutdown(); message handlers and the command tree stop taking new work
+shutting_down = False
+
+async def accept_interaction(interaction):
+    """Command tree check: during shutdown, new slash commands are turned away instead of starting work the drain would abandon."""
+    if not shutting_down:
+        return True
+    if interaction.type is discord.InteractionType.application_command:
+        try:
+            await interaction.response.send_message("The bot is restarting, please try again in a moment.", ephemeral=True)
+        except discord.HTTPException:
+            pass
+    return False
+
+bot.tree.interaction_check = accept_interaction
+
+def create_embed(title, description, color=discord.Color.blue()):
+    embed = discord.Embed(title=title, description=description, color=color)
+    embed.set_footer(text="Powered by Hideout Team")
+    return embed
+
+@bot.event
+async def on_ready():
+    logger.info(f"Logged in as {bot.user} (shards: {bot.shard_ids or 'all'} of {bot.shard_count or 1})")
+    if not timer.reported:
+        timer.reported = True
+        timer.mark("ready")
+        logger.info(timer.report())
+    await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="AI & Music"))
@@ -0,0 +1,102 @@
+"""Offline evaluation of the autoplay recommender.
+
+Splits each guild's listening history by time (the last --holdout share is
+held out), trains a CooccurrenceIndex on the rest, then walks the held-out
+plays and checks whether the track that was actually played next is among the
+top-k recommendations given the tracks before it. Training continues through
+the held-out part, the same way the bot updates the index as tracks finish.
+
+    python eval_autoplay.py                  # uses history.db
+    python eval_autoplay.py --synthetic      # generated history, no database needed
+"""
+import os
+import time
+import random
+import sqlite3
+import argparse
+from collections import defaultdict, deque
+from recommend import CooccurrenceIndex
+from listening_history import HISTORY_DB
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT guild_id, track_id FROM plays WHERE skipped = 0 ORDER BY guild_id, id").fetchall()
+    conn.close()
+    return rows
+
+def synthetic_history(guilds=200, plays=300, tracks=5000, album_size=12, seed=1):
+    """Guilds mostly play albums/playlists in order, with some jumps and random tracks mixed in."""
+    rng = random.Random(seed)
+    albums = [list(range(i, min(i + album_size, tracks))) for i in range(0, tracks, album_size)]
+    rows = []
+    for guild_id in range(1, guilds + 1):
+        favourites = rng.sample(albums, 8)
+        album, pos = rng.choice(favourites), 0
+        for _ in range(plays):
+            roll = rng.random()
+            if roll < 0.1:
+                track = rng.randrange(tracks)
+            else:
+                if roll < 0.25 or pos >= len(album):
+                    album, pos = rng.choice(favourites), 0
+                track = album[pos]
+                pos += 1
+            rows.append((guild_id, f"t{track}"))
+    return rows
+
+def evaluate(rows, holdout=0.2, ks=(1, 5, 10)):
+    by_guild = defaultdict(list)
+    for guild_id, track_id in rows:
+        by_guild[guild_id].append(track_id)
+
+    index = CooccurrenceIndex()
+    splits = {}
+    for guild_id, played in by_guild.items():
+        cut = int(len(played) * (1 - holdout))
+        splits[guild_id] = cut
+        index.train((guild_id, t) for t in played[:cut])
+
+    hits = dict.fromkeys(ks, 0)
+    answered = total = 0
+    lookup_time = 0.0
+    for guild_id, played in by_guild.items():
+        cut = splits[guild_id]
+        recent = deque(played[max(0, cut - 20):cut], maxlen=20)
+        for i in range(cut, len(played)):
+            if not recent:
+                recent.append(played[i])
+                continue
+            actual = played[i]
+            start = time.perf_counter()
+            suggestions = index.recommend(list(recent), exclude=set(recent), limit=max(ks))
+            lookup_time += time.perf_counter() - start
+            total += 1
+            answered += bool(suggestions)
+            for k in ks:
+                hits[k] += actual in suggestions[:k]
+            index.add(recent[-1], actual)
+            recent.append(actual)
+
+    print(f"Tracks indexed: {len(index)} | held-out transitions: {total}")
+    print(f"Coverage (any suggestion): {answered / max(total, 1):.1%}")
+    for k in ks:
+        print(f"Hit@{k}: {hits[k] / max(total, 1):.1%}")
+    print(f"Mean recommend latency: {lookup_time / max(total, 1) * 1e6:.1f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--db", default=HISTORY_DB)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rows = synthetic_history() if args.synthetic else load_history(args.db)
+    if not rows:
+        print("No listening history yet; try --synthetic")
+        return
+    evaluate(rows, args.holdout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import time
+import importlib
+from startup import timer
+
+# Feature modules, loaded in this order. Each one registers its commands and
+# events on core.bot at import time; heavy clients (AI, Lavalink) are created
+# later, on first use or in the background after login.
+FEATURES = ("ai", "music", "moderation", "raid", "utility", "polls", "fun", "summarize", "messages")
+
+def load_features():
+    for name in FEATURES:
+        start = time.perf_counter()
+        importlib.import_module(f"features.{name}")
+        timer.record(f"features.{name}", time.perf_counter() - start)
@@ -0,0 +1,123 @@
+import os
+import json
+import asyncio
+import logging
+import discord
+from core import bot, groq_api_key, perplexity_api_key, InFlight
+from interaction_guard import public_reply
+import responses
+
+logger = logging.getLogger(__name__)
+
+# openai/groq are the slowest imports in the bot, so the client is only built
+# the first time somebody actually talks to the AI.
+_client = None
+_model = None
+_answer_cache = None
+ai_requests = InFlight()
+
+def get_client():
+    global _client, _model
+    if _client is None:
+        if groq_api_key:
+            from groq import Groq
+            _client = Groq(api_key=groq_api_key)
+            _model = "llama-3.3-70b-versatile"
+        else:
+            # Perplexity uses an OpenAI-compatible API
+            from openai import OpenAI
+            _client = OpenAI(api_key=perplexity_api_key, base_url="https://api.perplexity.ai")
+            _model = "sonar"
+    return _client, _model
+
+def get_answer_cache():
+    """Semantic answer cache (see semantic_cache.py), built on first use so numpy isn't imported at startup."""
+    global _answer_cache
+    if _answer_cache is None:
+        from semantic_cache import SemanticCache
+        _answer_cache = bot.ai_cache = SemanticCache(
+            threshold=float(os.environ.get("AI_CACHE_THRESHOLD", "0.92")),
+            maxsize=int(os.environ.get("AI_CACHE_SIZE", "1024"))
+        )
+    return _answer_cache
+
+SYSTEM_PROMPT = "You are a helpful and friendly Discord AI music bot assistant."
+
+async def complete(content, system=SYSTEM_PROMPT, max_tokens=1024, temperature=0.7):
+    """One chat completion from the AI backend. Raises on API errors."""
+    with ai_requests:
+        client, model = get_client()
+        completion = await asyncio.to_thread(
+            client.chat.completions.create,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": content}
+            ],
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    return completion.choices[0].message.content
+
+async def get_ai_response(content, cache=True, scope=0):
+    # Near-identical questions ("how do I play music?") asked in the same
+    # scope (guild) reuse an earlier answer; pass cache=False for prompts
+    # that should get a fresh answer every time
+    if cache:
+        answer = get_answer_cache().get(content, scope)
+        if answer is not None:
+            return answer
+    try:
+        answer = await complete(content)
+        if cache and answer:
+            get_answer_cache().set(content, answer, scope)
+        return answer
+    except Exception as e:
+        logger.error(f"AI API Error: {e}")
+        return "⚠️ I'm having trouble connecting to my brain right now. Please try again in a moment!"
+
+@public_reply
+@bot.tree.command(name="chat", description="Chat with the AI")
+async def chat(interaction: discord.Interaction, message: str):
+    await interaction.response.defer()
+    response = await get_ai_response(message, scope=interaction.guild_id or interaction.user.id)
+    if response:
+        if len(response) > 1900:
+            response = response[:1900] + "..."
+        await interaction.followup.send(response)
+    else:
+        await interaction.followup.send("The AI couldn't generate a response.")
+
+def load_channel_config():
+    try:
+        if not os.path.exists('channel_config.json'):
+            with open('channel_config.json', 'w') as f:
+                json.dump({"channels": {}}, f)
+            return {"channels": {}}
+        with open('channel_config.json', 'r') as f:
+            data = json.load(f)
+            if "channels" not in data:
+                return {"channels": {}}
+            return data
+    except Exception as e:
+        logger.error(f"Error loading config: {e}")
+        return {"channels": {}}
+
+def save_channel_config(guild_id, channel_id):
+    config = load_channel_config()
+    if channel_id is None:
+        config["channels"].pop(str(guild_id), None)
+    else:
+        config["channels"][str(guild_id)] = channel_id
+    with open('channel_config.json', 'w') as f:
+        json.dump(config, f)
+
+@bot.tree.command(name="setup", description="Configure this channel for AI interaction")
+async def setup_channel(interaction: discord.Interaction):
+    save_channel_config(interaction.guild_id, interaction.channel_id)
+    await interaction.response.send_message(embed=responses.AI_SETUP_COMPLETE, ephemeral=True)
+
+@bot.tree.command(name="remove", description="Remove AI interaction from this guild")
+async def remove_channel(interaction: discord.Interaction):
+    save_channel_config(interaction.guild_id, None)
+    await interaction.response.send_message(embed=responses.AI_REMOVED, ephemeral=True)
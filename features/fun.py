@@ -0,0 +1,100 @@
+import random
+import discord
+from discord import app_commands
+from core import bot, create_embed
+from interaction_guard import public_reply
+from features.ai import get_ai_response
+
+@public_reply
+@bot.tree.command(name="rps", description="Play Rock, Paper, Scissors!")
+@app_commands.describe(choice="Choose your weapon!")
+@app_commands.choices(choice=[
+    app_commands.Choice(name="Rock", value="rock"),
+    app_commands.Choice(name="Paper", value="paper"),
+    app_commands.Choice(name="Scissors", value="scissors")
+])
+async def rps(interaction: discord.Interaction, choice: app_commands.Choice[str]):
+    choices = ["rock", "paper", "scissors"]
+    bot_choice = random.choice(choices)
+    user_choice = choice.value
+
+    result = ""
+    if user_choice == bot_choice:
+        result = "It's a **Draw**! 🤝"
+        color = discord.Color.light_grey()
+    elif (user_choice == "rock" and bot_choice == "scissors") or \
+         (user_choice == "paper" and bot_choice == "rock") or \
+         (user_choice == "scissors" and bot_choice == "paper"):
+        result = "You **Won**! 🎉"
+        color = discord.Color.green()
+    else:
+        result = "You **Lost**! 💀"
+        color = discord.Color.red()
+
+    emojis = {"rock": "🪨", "paper": "📄", "scissors": "✂️"}
+
+    embed = discord.Embed(title="Rock Paper Scissors", color=color)
+    embed.add_field(name="You", value=f"{emojis[user_choice]} {user_choice.title()}", inline=True)
+    embed.add_field(name="AI Bot", value=f"{emojis[bot_choice]} {bot_choice.title()}", inline=True)
+    embed.add_field(name="Result", value=result, inline=False)
+    await interaction.response.send_message(embed=embed)
+
+@public_reply
+@bot.tree.command(name="8ball", description="Ask the magic 8-ball a question")
+async def eightball(interaction: discord.Interaction, question: str):
+    responses = [
+        "It is certain.", "It is decidedly so.", "Without a doubt.", "Yes - definitely.",
+        "You may rely on it.", "As I see it, yes.", "Most likely.", "Outlook good.",
+        "Yes.", "Signs point to yes.", "Reply hazy, try again.", "Ask again later.",
+        "Better not tell you now.", "Cannot predict now.", "Concentrate and ask again.",
+        "Don't count on it.", "My reply is no.", "My sources say no.",
+        "Outlook not so good.", "Very doubtful."
+    ]
+
+    embed = discord.Embed(title="🔮 Magic 8-Ball", color=discord.Color.purple())
+    embed.add_field(name="Question", value=question, inline=False)
+    embed.add_field(name="Answer", value=random.choice(responses), inline=False)
+    await interaction.response.send_message(embed=embed)
+
+@public_reply
+@bot.tree.command(name="coinflip", description="Flip a coin and see the result!")
+@app_commands.describe(choice="Heads or Tails?")
+@app_commands.choices(choice=[
+    app_commands.Choice(name="Heads", value="Heads"),
+    app_commands.Choice(name="Tails", value="Tails")
+])
+async def coinflip(interaction: discord.Interaction, choice: app_commands.Choice[str] = None):
+    result = random.choice(["Heads", "Tails"])
+
+    embed = discord.Embed(title="🪙 Coin Flip", color=discord.Color.gold())
+
+    if choice:
+        user_guess = choice.value
+        if user_guess == result:
+            prediction = f"✅ You guessed right! It's **{result}**."
+            embed.color = discord.Color.green()
+        else:
+            prediction = f"❌ Better luck next time! It's **{result}**."
+            embed.color = discord.Color.red()
+        embed.add_field(name="Prediction", value=prediction, inline=False)
+
+    if result == "Heads":
+        embed.description = "The coin spins in the air and lands on... **Heads**!"
+        embed.set_thumbnail(url="https://i.imgur.com/vHshU7f.png") # Generic heads icon
+    else:
+        embed.description = "The coin spins in the air and lands on... **Tails**!"
+        embed.set_thumbnail(url="https://i.imgur.com/nCHpEWy.png") # Generic tails icon
+
+    embed.add_field(name="Result", value=f"✨ It's **{result}**!", inline=False)
+    embed.set_footer(text=f"Flipped by {interaction.user.name}", icon_url=interaction.user.display_avatar.url)
+
+    await interaction.response.send_message(embed=embed)
+
+@public_reply
+@bot.tree.command(name="meme", description="Get a random meme from AI")
+async def meme(interaction: discord.Interaction):
+    await interaction.response.defer()
+    prompt = "Generate a short, funny meme caption or a quick joke related to gaming or discord bots."
+    response = await get_ai_response(prompt, cache=False)
+    embed = create_embed("AI Meme / Joke", response, discord.Color.random())
+    await interaction.followup.send(embed=embed)
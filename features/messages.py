@@ -0,0 +1,93 @@
+import asyncio
+import discord
+import wavelink
+import core
+from core import bot, create_embed
+import responses
+from features.ai import get_ai_response, load_channel_config
+from features.music import get_track_embed, track_search
+from automod_rules import MessageContext
+from message_pipeline import pipeline
+
+@bot.event
+async def on_message(message):
+    await pipeline.dispatch(message, MessageContext(message))
+
+@pipeline.stage("normalize", 0)
+async def normalize_stage(message, ctx):
+    if message.author.bot or core.shutting_down:
+        return True
+    ctx.mentions_bot = bot.user.mentioned_in(message)
+    # Text with the bot's mention removed, for mention commands and AI prompts
+    ctx.command_text = message.content.replace(f'<@!{bot.user.id}>', '').replace(f'<@{bot.user.id}>', '').strip() if ctx.mentions_bot else message.content
+    return False
+
+@pipeline.stage("commands", 20)
+async def command_stage(message, ctx):
+    # Legacy prefix commands
+    command_ctx = await bot.get_context(message)
+    if command_ctx.command is None:
+        return False
+    await bot.invoke(command_ctx)
+    return True
+
+@pipeline.stage("intents", 30)
+async def intent_stage(message, ctx):
+    channel_id = None
+    if message.guild:
+        config = load_channel_config()
+        channel_id = config.get("channels", {}).get(str(message.guild.id))
+
+    content = ctx.command_text
+
+    # Check if AI should respond (Setup channel or mention)
+    should_respond = ctx.mentions_bot or (channel_id and message.channel.id == channel_id)
+    if not should_respond:
+        return False
+
+    if not content.lower().startswith(('play ', 'skip', 'stop', 'queue', 'pause', 'resume')):
+        async with message.channel.typing():
+            response = await get_ai_response(content, scope=message.guild.id if message.guild else message.author.id)
+            for i in range(0, len(response), 2000):
+                await message.reply(response[i:i+2000])
+        return True
+
+    if ctx.mentions_bot and message.guild and content.lower().startswith('play '):
+        search = content[5:].strip()
+        if search:
+            if not message.author.voice:
+                await message.channel.send(embed=responses.JOIN_VOICE_FIRST)
+                return True
+
+            try:
+                if not message.guild.voice_client:
+                    try:
+                        vc: wavelink.Player = await message.author.voice.channel.connect(cls=wavelink.Player, self_deaf=True)
+                    except asyncio.TimeoutError:
+                        await message.channel.send(embed=responses.CONNECTION_TIMEOUT)
+                        return True
+                else:
+                    vc: wavelink.Player = message.guild.voice_client
+
+                vc.home_channel = message.channel
+
+                tracks = await track_search.search(search)
+                if not tracks:
+                    await message.channel.send(embed=create_embed("Not Found", f"No tracks found for: `{search}`", discord.Color.orange()))
+                    return True
+
+                track = tracks[0]
+                # Attach the requester to the track object
+                track.requester = message.author
+
+                if vc.playing:
+                    await vc.queue.put_wait(track)
+                    await message.channel.send(embed=get_track_embed("Added to Queue", track, discord.Color.green()))
+                else:
+                    await vc.play(track)
+                    await message.channel.send(embed=get_track_embed("Playing Now", track, discord.Color.green()))
+                return True
+            except Exception as e:
+                await message.channel.send(embed=create_embed("Error", f"An error occurred: `{str(e)}`", discord.Color.red()))
+                return True
+    return False
@@ -0,0 +1,785 @@
+import time
+import datetime
+import re
+import asyncio
+import json
+import logging
+import discord
+from discord import app_commands
+from core import bot, create_embed
+from interaction_guard import public_reply
+from member_cache import all_members
+from message_pipeline import pipeline
+from automod_rules import CONDITIONS, RuleError, compile_plan, normalize
+from rest_telemetry import rest_priority, CRITICAL
+
+logger = logging.getLogger(__name__)
+
+@public_reply
+@bot.tree.command(name="kick", description="Kick a member from the server")
+@app_commands.checks.has_permissions(kick_members=True)
+async def kick(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
+    try:
+        await member.kick(reason=reason)
+        bot.modlog.log(interaction.guild_id, "kick", member.id, interaction.user.id, reason)
+        embed = create_embed("Member Kicked", f"**{member}** has been kicked.\n**Reason:** {reason}", discord.Color.red())
+        embed.set_thumbnail(url=member.display_avatar.url)
+        await interaction.response.send_message(embed=embed)
+    except Exception as e:
+        await interaction.response.send_message(embed=create_embed("Error", f"Failed to kick member: {e}", discord.Color.red()), ephemeral=True)
+
+@public_reply
+@bot.tree.command(name="ban", description="Ban a member from the server")
+@app_commands.checks.has_permissions(ban_members=True)
+async def ban(interaction: discord.Interaction, member: discord.Member, reason: str = "No reason provided"):
+    try:
+        await member.ban(reason=reason)
+        bot.modlog.log(interaction.guild_id, "ban", member.id, interaction.user.id, reason)
+        embed = create_embed("Member Banned", f"**{member}** has been banned.\n**Reason:** {reason}", discord.Color.dark_red())
+        embed.set_thumbnail(url=member.display_avatar.url)
+        await interaction.response.send_message(embed=embed)
+    except Exception as e:
+        await interaction.response.send_message(embed=create_embed("Error", f"Failed to ban member: {e}", discord.Color.red()), ephemeral=True)
+
+# Discord only bulk-deletes messages younger than 14 days; keep a small margin
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14, minutes=-5)
+PURGE_MAX = 10000
+# With filters we may have to look further back than `amount` to find matches
+PURGE_SCAN_LIMIT = 20000
+PURGE_PROGRESS_INTERVAL = 3
+
+class PurgeProgress:
+    """Throttled progress reporting by editing the original (deferred) response."""
+    def __init__(self, interaction, amount):
+        self.interaction = interaction
+        self.amount = amount
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+        self.last_update = time.monotonic()
+        self.enabled = True
+
+    async def update(self, force=False):
+        now = time.monotonic()
+        if not self.enabled or (not force and now - self.last_update < PURGE_PROGRESS_INTERVAL):
+            return
+        self.last_update = now
+        try:
+            await self.interaction.edit_original_response(embed=create_embed(
+                "🧹 Clearing Messages",
+                f"Deleted **{self.deleted}** / {self.amount} messages ({self.scanned} scanned)...",
+                discord.Color.blue()
+            ))
+        except discord.HTTPException:
+            # Interaction token expired (15 min); keep deleting without progress
+            self.enabled = False
+
+async def purge_messages(channel, amount, check, progress):
+    """Deletes up to `amount` messages matching `check`, newest first.
+
+    Recent messages go out in 100-message bulk deletes, messages older than
+    14 days one by one. discord.py waits out the rate limits of both routes.
+    """
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    scan_limit = amount if check is None else max(amount, PURGE_SCAN_LIMIT)
+    batch = []
+    old = []
+
+    async for message in channel.history(limit=scan_limit):
+        progress.scanned += 1
+        if check is not None and not check(message):
+            continue
+        # History is newest first, so once we pass the cutoff everything else is old
+        if message.created_at > cutoff:
+            batch.append(message)
+            if len(batch) == 100:
+                await channel.delete_messages(batch)
+                progress.deleted += len(batch)
+                batch = []
+                await progress.update()
+        else:
+            old.append(message)
+        if len(batch) + len(old) + progress.deleted >= amount:
+            break
+
+    if len(batch) == 1:
+        await batch[0].delete()
+    elif batch:
+        await channel.delete_messages(batch)
+    progress.deleted += len(batch)
+    await progress.update()
+
+    for i, message in enumerate(old):
+        try:
+            await message.delete()
+            progress.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            # Lost the permission partway through; the rest would fail the same way
+            progress.failed += len(old) - i
+            break
+        except discord.HTTPException as e:
+            logger.warning(f"Couldn't delete message {message.id} in {channel.id}: {e}")
+            progress.failed += 1
+        await progress.update()
+    return progress.deleted
+
+@bot.tree.command(name="clear", description="Clear a specified amount of messages")
+@app_commands.describe(
+    amount="How many messages to delete",
+    user="Only delete messages from this user",
+    bots="Only delete messages from bots",
+    contains="Only delete messages containing this text",
+    attachments="Only delete messages with attachments"
+)
+@app_commands.checks.has_permissions(manage_messages=True)
+async def clear(interaction: discord.Interaction, amount: int, user: discord.User = None, bots: bool = False, contains: str = None, attachments: bool = False):
+    if amount < 1:
+        return await interaction.response.send_message("Please specify an amount greater than 0.", ephemeral=True)
+    if amount > PURGE_MAX:
+        return await interaction.response.send_message(f"You can clear at most {PURGE_MAX} messages at once.", ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+
+    filters = []
+    if user:
+        filters.append(lambda m: m.author.id == user.id)
+    if bots:
+        filters.append(lambda m: m.author.bot)
+    if contains:
+        needle = contains.lower()
+        filters.append(lambda m: needle in m.content.lower())
+    if attachments:
+        filters.append(lambda m: bool(m.attachments))
+    check = (lambda m: all(f(m) for f in filters)) if filters else None
+
+    progress = PurgeProgress(interaction, amount)
+    try:
+        deleted = await purge_messages(interaction.channel, amount, check, progress)
+    except discord.Forbidden:
+        return await interaction.followup.send(embed=create_embed("Error", "I don't have permission to delete messages here.", discord.Color.red()))
+    except discord.HTTPException as e:
+        logger.warning(f"Purge in {interaction.channel_id} failed: {e}")
+        deleted = progress.deleted
+        progress.failed += 1
+
+    bot.modlog.log(interaction.guild_id, "purge", user.id if user else None, interaction.user.id, contains, channel_id=interaction.channel_id, count=deleted)
+    if progress.failed:
+        embed = create_embed("Messages Cleared", f"Cleared **{deleted}** messages; **{progress.failed}** couldn't be deleted.", discord.Color.orange())
+    else:
+        embed = create_embed("Messages Cleared", f"Successfully cleared **{deleted}** messages.", discord.Color.green())
+    try:
+        await interaction.edit_original_response(embed=embed)
+    except discord.HTTPException:
+        await interaction.channel.send(f"{interaction.user.mention}", embed=embed, delete_after=10)
+
+@bot.tree.command(name="antinuke", description="Enable or disable anti-nuke protection")
+@app_commands.describe(status="Enable or Disable anti-nuke")
+@app_commands.choices(status=[
+    app_commands.Choice(name="Enable", value="on"),
+    app_commands.Choice(name="Disable", value="off")
+])
+@app_commands.checks.has_permissions(administrator=True)
+async def antinuke(interaction: discord.Interaction, status: app_commands.Choice[str]):
+    config = {}
+    try:
+        with open("antinuke_config.json", "r") as f:
+            config = json.load(f)
+    except:
+        pass
+
+    is_enabled = status.value == "on"
+    config[str(interaction.guild.id)] = is_enabled
+    with open("antinuke_config.json", "w") as f:
+        json.dump(config, f)
+
+    embed = discord.Embed(
+        title="🛡️ Anti-Nuke System",
+        description=f"The anti-nuke protection has been successfully **{status.name.lower()}d**.",
+        color=discord.Color.green() if is_enabled else discord.Color.red()
+    )
+
+    if is_enabled:
+        embed.add_field(
+            name="✨ Protections Active",
+            value="• **Channel Protection:** Bans users who delete channels.\n"
+                  "• **Role Protection:** Bans users who delete roles.\n"
+                  "• **Bot Protection:** Bans both the unauthorized bot and the user who added it.",
+            inline=False
+        )
+        embed.set_footer(text="Powered by Aditya Official NGT Team • Monitoring Active")
+    else:
+        embed.add_field(
+            name="⚠️ Warning",
+            value="Your server is now vulnerable to nuking attempts. It is recommended to keep this enabled.",
+            inline=False
+        )
+        embed.set_footer(text="Powered by Aditya Official NGT Team • Monitoring Disabled")
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    try:
+        with open("antinuke_config.json", "r") as f:
+            config = json.load(f)
+            if not config.get(str(channel.guild.id)):
+                return
+    except:
+        return
+
+    async for entry in channel.guild.audit_logs(limit=1, action=discord.AuditLogAction.channel_delete):
+        user = entry.user
+        if user.id == channel.guild.owner_id or user.id == bot.user.id:
+            return
+
+        try:
+            with rest_priority(CRITICAL):
+                await channel.guild.ban(user, reason="Anti-nuke: Channel deletion detected")
+            bot.modlog.log(channel.guild.id, "antinuke_ban", user.id, bot.user.id, "Channel deletion detected", channel=channel.name)
+            logger.info(f"Anti-nuke: Banned {user} for deleting channel {channel.name}")
+        except:
+            pass
+
+@bot.event
+async def on_guild_role_delete(role):
+    try:
+        with open("antinuke_config.json", "r") as f:
+            config = json.load(f)
+            if not config.get(str(role.guild.id)):
+                return
+    except:
+        return
+
+    async for entry in role.guild.audit_logs(limit=1, action=discord.AuditLogAction.role_delete):
+        user = entry.user
+        if user.id == role.guild.owner_id or user.id == bot.user.id:
+            return
+
+        try:
+            with rest_priority(CRITICAL):
+                await role.guild.ban(user, reason="Anti-nuke: Role deletion detected")
+            bot.modlog.log(role.guild.id, "antinuke_ban", user.id, bot.user.id, "Role deletion detected", role=role.name)
+            logger.info(f"Anti-nuke: Banned {user} for deleting role {role.name}")
+        except:
+            pass
+
+@bot.event
+async def on_member_join(member):
+    try:
+        with open("antinuke_config.json", "r") as f:
+            config = json.load(f)
+            if not config.get(str(member.guild.id)):
+                return
+    except:
+        return
+
+    if member.bot:
+        async for entry in member.guild.audit_logs(limit=1, action=discord.AuditLogAction.bot_add):
+            user = entry.user
+            if user.id == member.guild.owner_id or user.id == bot.user.id:
+                return
+
+            # Both bans go out at once instead of one after the other
+            with rest_priority(CRITICAL):
+                results = await asyncio.gather(
+                    member.ban(reason="Anti-nuke: Unauthorized bot addition"),
+                    member.guild.ban(user, reason="Anti-nuke: Adding unauthorized bot"),
+                    return_exceptions=True
+                )
+            if not isinstance(results[0], Exception):
+                bot.modlog.log(member.guild.id, "antinuke_ban", member.id, bot.user.id, "Unauthorized bot addition")
+            if not isinstance(results[1], Exception):
+                bot.modlog.log(member.guild.id, "antinuke_ban", user.id, bot.user.id, "Adding unauthorized bot", bot_id=member.id)
+                logger.info(f"Anti-nuke: Banned {user} for adding bot {member}")
+
+@bot.tree.command(name="role", description="Give or remove a role from a member")
+@app_commands.describe(member="The member to manage", role="The role to give/remove")
+@app_commands.checks.has_permissions(manage_roles=True)
+async def role(interaction: discord.Interaction, member: discord.Member, role: discord.Role):
+    """Gives or removes a role from a member. Requires Manage Roles permission."""
+    try:
+        if role in member.roles:
+            await member.remove_roles(role)
+            await interaction.response.send_message(f"✅ Removed role **{role.name}** from **{member.name}**", ephemeral=True)
+        else:
+            await member.add_roles(role)
+            await interaction.response.send_message(f"✅ Added role **{role.name}** to **{member.name}**", ephemeral=True)
+    except discord.Forbidden:
+        await interaction.response.send_message("❌ I don't have permission to manage this role! Make sure my role is above it in the server settings.", ephemeral=True)
+    except Exception as e:
+        await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
+
+AUTOMOD_CONFIG_FILE = "automod.json"
+
+def load_automod_config():
+    try:
+        with open(AUTOMOD_CONFIG_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+automod_config = load_automod_config()
+automod_plans = {}
+
+def get_automod_plan(guild_id):
+    """The compiled plan for a guild (None if automod is off). Compiled on first use and after every change."""
+    key = str(guild_id)
+    if key not in automod_plans:
+        try:
+            automod_plans[key] = compile_plan(automod_config.get(key, {}))
+        except RuleError as e:
+            logger.error(f"AutoMod config for {guild_id} doesn't compile: {e}")
+            automod_plans[key] = None
+    return automod_plans[key]
+
+def update_automod_config(guild_id, settings):
+    """Validates and stores a guild's new automod settings. Raises RuleError if they don't compile."""
+    key = str(guild_id)
+    plan = compile_plan(settings)
+    automod_config[key] = settings
+    automod_plans[key] = plan
+    with open(AUTOMOD_CONFIG_FILE, "w") as f:
+        json.dump(automod_config, f)
+
+async def run_automod(message, ctx):
+    """Evaluates the guild's automod plan against a message and applies the matching rule. True if it matched."""
+    plan = get_automod_plan(message.guild.id)
+    if plan is None or message.author.id in plan.whitelist or message.author.guild_permissions.manage_messages:
+        return False
+    rule = plan.evaluate(ctx)
+    if rule is None:
+        return False
+
+    author = message.author
+    if "log" in rule.actions:
+        bot.modlog.log(message.guild.id, rule.log_action, author.id, None, ", ".join(rule.actions), channel_id=message.channel.id, rule=rule.name)
+    if "delete" in rule.actions:
+        try:
+            await message.delete()
+        except discord.HTTPException:
+            pass
+    if "timeout" in rule.actions:
+        try:
+            await author.timeout(datetime.timedelta(seconds=rule.timeout), reason=f"AutoMod: {rule.name}")
+        except discord.HTTPException as e:
+            logger.warning(f"AutoMod timeout failed for {author.id} in {message.guild.id}: {e}")
+    if "warn" in rule.actions:
+        try:
+            await author.send(f"⚠️ Warning from **{message.guild.name}**: {rule.message}")
+        except discord.HTTPException as e:
+            logger.info(f"AutoMod DM to {author.id} failed: {e}")
+            await message.channel.send(f"{author.mention}, {rule.message} (I couldn't DM you)", delete_after=5)
+    return True
+
+@pipeline.stage("moderation", 10)
+async def moderation_stage(message, ctx):
+    # AutoMod and keyword filter; ctx normalizes the text once for every check
+    if message.guild is None or not isinstance(message.author, discord.Member):
+        return False
+    with rest_priority(CRITICAL):
+        return await run_automod(message, ctx)
+
+@public_reply
+@bot.tree.command(name="automod", description="Setup basic automod (anti-spam, anti-invite, blacklist)")
+@app_commands.describe(type="Type of protection", action="Action to take", words="Comma separated words for blacklist (only for Blacklist type)")
+@app_commands.choices(type=[
+    app_commands.Choice(name="Anti-Invite", value="anti_invite"),
+    app_commands.Choice(name="Anti-Spam", value="anti_spam"),
+    app_commands.Choice(name="Blacklist", value="blacklist")
+], action=[
+    app_commands.Choice(name="Warn", value="warn"),
+    app_commands.Choice(name="Delete", value="delete"),
+    app_commands.Choice(name="Both", value="both")
+])
+@app_commands.checks.has_permissions(administrator=True)
+async def automod(interaction: discord.Interaction, type: app_commands.Choice[str], action: app_commands.Choice[str], words: str = None):
+    try:
+        settings = dict(automod_config.get(str(interaction.guild.id), {}))
+        settings[type.value] = action.value
+        if type.value == "blacklist" and words:
+            settings["blacklisted_words"] = [w.strip().lower() for w in words.split(",") if w.strip()]
+        update_automod_config(interaction.guild.id, settings)
+
+        msg = f"AutoMod `{type.name}` set to `{action.name}`!"
+        if type.value == "blacklist" and words:
+            msg += f" Words: `{words}`"
+        await interaction.response.send_message(msg)
+    except Exception as e:
+        await interaction.response.send_message(f"Error: {e}")
+
+@bot.tree.command(name="automodrule", description="Add, remove or list custom AutoMod rules")
+@app_commands.describe(
+    operation="What to do",
+    name="Rule name",
+    regex="Regular expression to match",
+    words="Comma separated words/phrases",
+    mentions="Match messages with at least this many mentions",
+    caps="Match messages with at least this % of capital letters",
+    links="Comma separated link domains (e.g. bit.ly, discord.com/invite)",
+    attachments="Comma separated file extensions (e.g. exe, zip) or * for any",
+    rate="Only trigger after this many matching messages from a user within 10 seconds",
+    actions="Comma separated actions: delete, warn, timeout, log (default: delete, log)",
+    timeout="Timeout length in minutes for the timeout action",
+    message="Warning sent to the user"
+)
+@app_commands.choices(operation=[
+    app_commands.Choice(name="Add", value="add"),
+    app_commands.Choice(name="Remove", value="remove"),
+    app_commands.Choice(name="List", value="list")
+])
+@app_commands.checks.has_permissions(administrator=True)
+async def automodrule(interaction: discord.Interaction, operation: app_commands.Choice[str], name: str = None, regex: str = None, words: str = None,
+                      mentions: app_commands.Range[int, 1, 100] = None, caps: app_commands.Range[int, 50, 100] = None, links: str = None,
+                      attachments: str = None, rate: app_commands.Range[int, 2, 50] = None, actions: str = None,
+                      timeout: app_commands.Range[int, 1, 40320] = 10, message: str = None):
+    settings = dict(automod_config.get(str(interaction.guild_id), {}))
+    rules = list(settings.get("rules", []))
+
+    if operation.value == "list":
+        if not rules:
+            return await interaction.response.send_message("No custom AutoMod rules.", ephemeral=True)
+        lines = []
+        for rule in rules:
+            conditions = ", ".join(f"{k}={rule[k]}" for k in CONDITIONS if k in rule)
+            lines.append(f"**{rule['name']}**: {conditions} → {', '.join(rule['actions'])}")
+        return await interaction.response.send_message(embed=create_embed("🛡️ AutoMod Rules", "\n".join(lines)[:4000], discord.Color.blue()), ephemeral=True)
+
+    if not name:
+        return await interaction.response.send_message("Give the rule a name.", ephemeral=True)
+
+    if operation.value == "remove":
+        remaining = [r for r in rules if r["name"].lower() != name.lower()]
+        if len(remaining) == len(rules):
+            return await interaction.response.send_message(f"No rule named `{name}`.", ephemeral=True)
+        settings["rules"] = remaining
+        update_automod_config(interaction.guild_id, settings)
+        return await interaction.response.send_message(f"Removed AutoMod rule `{name}`.", ephemeral=True)
+
+    split = lambda value: [v.strip() for v in value.split(",") if v.strip()]
+    rule = {"name": name, "actions": split(actions) if actions else ["delete", "log"], "timeout": timeout * 60}
+    if regex:
+        rule["regex"] = regex[:200]
+    if words:
+        rule["words"] = [w.lower() for w in split(words)]
+    if mentions:
+        rule["mentions"] = mentions
+    if caps:
+        rule["caps"] = caps / 100
+    if links:
+        rule["links"] = split(links)
+    if attachments:
+        rule["attachments"] = split(attachments)
+    if rate:
+        rule["rate"] = [rate, 10]
+    if message:
+        rule["message"] = message
+
+    settings["rules"] = [r for r in rules if r["name"].lower() != name.lower()] + [rule]
+    try:
+        update_automod_config(interaction.guild_id, settings)
+    except RuleError as e:
+        return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+    await interaction.response.send_message(f"✅ AutoMod rule `{name}` saved.", ephemeral=True)
+
+@bot.tree.command(name="keywordfilter", description="Manage this server's filtered keywords")
+@app_commands.describe(operation="What to do", words="Comma separated keywords/phrases")
+@app_commands.choices(operation=[
+    app_commands.Choice(name="Add", value="add"),
+    app_commands.Choice(name="Remove", value="remove"),
+    app_commands.Choice(name="List", value="list"),
+    app_commands.Choice(name="Clear", value="clear")
+])
+@app_commands.checks.has_permissions(administrator=True)
+async def keywordfilter(interaction: discord.Interaction, operation: app_commands.Choice[str], words: str = None):
+    settings = dict(automod_config.get(str(interaction.guild_id), {}))
+    keywords = list(settings.get("keywords", []))
+
+    if operation.value == "list":
+        if not keywords:
+            return await interaction.response.send_message("The keyword filter is off for this server.", ephemeral=True)
+        return await interaction.response.send_message(embed=create_embed("🔤 Filtered Keywords", ", ".join(f"`{k}`" for k in keywords)[:4000], discord.Color.blue()), ephemeral=True)
+
+    if operation.value == "clear":
+        keywords = []
+    else:
+        given = [normalize(w.strip()) for w in (words or "").split(",") if w.strip()]
+        if not given:
+            return await interaction.response.send_message("Give one or more comma separated keywords.", ephemeral=True)
+        if operation.value == "add":
+            keywords += [w for w in given if w not in keywords]
+        else:
+            keywords = [k for k in keywords if k not in given]
+
+    if keywords:
+        settings["keywords"] = keywords
+    else:
+        settings.pop("keywords", None)
+    update_automod_config(interaction.guild_id, settings)
+    status = f"**{len(keywords)}** keyword(s) filtered." if keywords else "The keyword filter is now off."
+    await interaction.response.send_message(embed=create_embed("🔤 Keyword Filter", status, discord.Color.green()), ephemeral=True)
+
+@bot.tree.command(name="whitelist", description="Add or remove a user from the AutoMod whitelist")
+@app_commands.checks.has_permissions(administrator=True)
+async def whitelist(interaction: discord.Interaction, member: discord.Member):
+    try:
+        settings = dict(automod_config.get(str(interaction.guild_id), {}))
+        whitelist_list = list(settings.get("whitelist", []))
+
+        if member.id in whitelist_list:
+            whitelist_list.remove(member.id)
+            msg = f"Removed **{member}** from the whitelist."
+        else:
+            whitelist_list.append(member.id)
+            msg = f"Added **{member}** to the whitelist."
+
+        settings["whitelist"] = whitelist_list
+        update_automod_config(interaction.guild_id, settings)
+
+        await interaction.response.send_message(embed=create_embed("AutoMod Whitelist", msg, discord.Color.green()), ephemeral=True)
+    except Exception as e:
+        await interaction.response.send_message(f"Error: {e}", ephemeral=True)
+
+MODLOG_PAGE_SIZE = 10
+MODLOG_ACTIONS = [
+    app_commands.Choice(name="Kick", value="kick"),
+    app_commands.Choice(name="Ban", value="ban"),
+    app_commands.Choice(name="Purge", value="purge"),
+    app_commands.Choice(name="Anti-Nuke Ban", value="antinuke_ban"),
+    app_commands.Choice(name="AutoMod: Invite", value="automod_invite"),
+    app_commands.Choice(name="AutoMod: Spam", value="automod_spam"),
+    app_commands.Choice(name="AutoMod: Blacklist", value="automod_blacklist"),
+    app_commands.Choice(name="AutoMod: Custom Rule", value="automod_rule"),
+    app_commands.Choice(name="Keyword Filter", value="keyword_filter"),
+    app_commands.Choice(name="Raid Lockdown", value="raid_lockdown"),
+]
+
+class ModLogView(discord.ui.View):
+    def __init__(self, author_id, filters, total):
+        super().__init__(timeout=300)
+        self.author_id = author_id
+        self.filters = filters
+        self.total = total
+        # `before` cursor of every page visited so far, so Previous is a pop
+        self.cursors = [None]
+        self.rows = []
+
+    async def load(self):
+        rows = await bot.modlog.query(**self.filters, before=self.cursors[-1], limit=MODLOG_PAGE_SIZE + 1)
+        self.rows = rows[:MODLOG_PAGE_SIZE]
+        self.previous_page.disabled = len(self.cursors) == 1
+        self.next_page.disabled = len(rows) <= MODLOG_PAGE_SIZE
+
+    def render(self):
+        lines = []
+        for row in self.rows:
+            line = f"<t:{int(row['ts'])}:R> **{row['action']}**"
+            if row["user_id"]:
+                line += f" <@{row['user_id']}>"
+            if row["moderator_id"]:
+                line += f" by <@{row['moderator_id']}>"
+            if row["reason"]:
+                line += f" — {row['reason'][:100]}"
+            lines.append(line)
+        embed = create_embed("📋 Moderation Log", "\n".join(lines) or "No events found.", discord.Color.blue())
+        embed.set_footer(text=f"Page {len(self.cursors)} • {self.total} event(s)")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.author_id
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.pop()
+        await self.load()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        last = self.rows[-1]
+        self.cursors.append((last["ts"], last["id"]))
+        await self.load()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+@bot.tree.command(name="modlog", description="Browse moderation and anti-nuke events for this server")
+@app_commands.describe(user="Only events for this user", action="Only this kind of event", days="Only the last N days")
+@app_commands.choices(action=MODLOG_ACTIONS)
+@app_commands.checks.has_permissions(view_audit_log=True)
+async def modlog(interaction: discord.Interaction, user: discord.User = None, action: app_commands.Choice[str] = None, days: app_commands.Range[int, 1, 365] = None):
+    await interaction.response.defer(ephemeral=True)
+    # Make sure events still sitting in the write buffer show up
+    await bot.modlog.flush()
+
+    filters = {
+        "guild_id": interaction.guild_id,
+        "user_id": user.id if user else None,
+        "action": action.value if action else None,
+        "since": time.time() - days * 86400 if days else None,
+    }
+    total = await bot.modlog.count(**filters)
+    view = ModLogView(interaction.user.id, filters, total)
+    await view.load()
+    await interaction.followup.send(embed=view.render(), view=view, ephemeral=True)
+
+# Mass moderation. Bans use Discord's bulk ban endpoint (200 users per call);
+# kicks, and bans when bulk ban isn't allowed, run through a small concurrent
+# executor. discord.py already waits out per-route rate limits, the semaphore
+# keeps us well under the global limit.
+MASS_ACTION_CONCURRENCY = 5
+MASS_ACTION_MAX = 1000
+BULK_BAN_CHUNK = 200
+
+async def run_concurrently(user_ids, action, limit=MASS_ACTION_CONCURRENCY):
+    """Awaits `action(user_id)` for every ID with at most `limit` in flight. Returns (succeeded, failed) ID lists."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(user_id):
+        async with semaphore:
+            try:
+                await action(user_id)
+                return True
+            except discord.HTTPException:
+                return False
+
+    results = await asyncio.gather(*(run(user_id) for user_id in user_ids))
+    succeeded = [user_id for user_id, ok in zip(user_ids, results) if ok]
+    failed = [user_id for user_id, ok in zip(user_ids, results) if not ok]
+    return succeeded, failed
+
+async def mass_ban(guild, user_ids, reason):
+    banned, failed = [], []
+    for i in range(0, len(user_ids), BULK_BAN_CHUNK):
+        chunk = user_ids[i:i + BULK_BAN_CHUNK]
+        try:
+            result = await guild.bulk_ban([discord.Object(id=user_id) for user_id in chunk], reason=reason, delete_message_seconds=0)
+            banned += [user.id for user in result.banned]
+            failed += [user.id for user in result.failed]
+        except discord.HTTPException as e:
+            if not isinstance(e, discord.Forbidden) and e.status < 500:
+                # e.g. "Failed to ban users": none of the chunk could be banned
+                logger.warning(f"Bulk ban in {guild.id} failed: {e}")
+                failed += chunk
+                continue
+            # Bulk ban also needs Manage Server, and a 5xx may be transient; fall back to individual bans
+            ok, bad = await run_concurrently(chunk, lambda user_id: guild.ban(discord.Object(id=user_id), reason=reason, delete_message_seconds=0))
+            banned += ok
+            failed += bad
+    return banned, failed
+
+async def mass_kick(guild, user_ids, reason):
+    return await run_concurrently(user_ids, lambda user_id: guild.kick(discord.Object(id=user_id), reason=reason))
+
+async def select_mass_targets(interaction, ids, joined_within, account_younger_than):
+    """Collects target IDs from an ID list and/or join-time / account-age filters, minus protected members."""
+    guild = interaction.guild
+    now = discord.utils.utcnow()
+
+    targets = set(int(user_id) for user_id in re.findall(r"\d{15,20}", ids or ""))
+    members = None
+    if joined_within or account_younger_than:
+        # Only the filters need the whole member list; with the lean cache that means requesting it
+        members = {m.id: m for m in await all_members(guild)}
+        for member in members.values():
+            if joined_within and (not member.joined_at or now - member.joined_at > datetime.timedelta(minutes=joined_within)):
+                continue
+            if account_younger_than and now - member.created_at > datetime.timedelta(days=account_younger_than):
+                continue
+            targets.add(member.id)
+
+    # Never touch the owner, ourselves, the moderator, or anyone at/above the moderator's top role
+    protected = {guild.owner_id, bot.user.id, interaction.user.id}
+    invoker_top = interaction.user.top_role if isinstance(interaction.user, discord.Member) else None
+    selected = []
+    for user_id in targets:
+        if user_id in protected:
+            continue
+        # Plain ID lists use whatever is cached; uncached IDs are treated as non-members
+        member = members.get(user_id) if members is not None else guild.get_member(user_id)
+        if member and invoker_top and member.top_role >= invoker_top and interaction.user.id != guild.owner_id:
+            continue
+        selected.append(user_id)
+    return selected
+
+class MassActionConfirm(discord.ui.View):
+    def __init__(self, author_id):
+        super().__init__(timeout=60)
+        self.author_id = author_id
+        self.confirmed = False
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.author_id
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.confirmed = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        self.stop()
+
+async def run_mass_action(interaction, action, ids, joined_within, account_younger_than, reason):
+    """Selects, confirms and runs a mass ban/kick. Returns (done, failed) user IDs, or None if nothing was run."""
+    if not (ids or joined_within or account_younger_than):
+        return await interaction.response.send_message("Give a list of IDs and/or a join-time or account-age filter.", ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+
+    targets = await select_mass_targets(interaction, ids, joined_within, account_younger_than)
+    if not targets:
+        return await interaction.followup.send("No matching users found.", ephemeral=True)
+    if len(targets) > MASS_ACTION_MAX:
+        return await interaction.followup.send(f"That matches {len(targets)} users; the limit is {MASS_ACTION_MAX} per run. Narrow the filters.", ephemeral=True)
+
+    verb = "ban" if action == "ban" else "kick"
+    view = MassActionConfirm(interaction.user.id)
+    await interaction.followup.send(embed=create_embed(
+        f"⚠️ Mass {verb.title()}",
+        f"This will {verb} **{len(targets)}** user(s).\n**Reason:** {reason}",
+        discord.Color.orange()
+    ), view=view, ephemeral=True)
+    await view.wait()
+    if not view.confirmed:
+        return await interaction.edit_original_response(embed=create_embed("Cancelled", f"Mass {verb} cancelled.", discord.Color.light_grey()), view=None)
+
+    await interaction.edit_original_response(embed=create_embed(f"Mass {verb.title()}", f"Working on {len(targets)} user(s)...", discord.Color.blue()), view=None)
+    start = time.monotonic()
+    with rest_priority(CRITICAL):
+        if action == "ban":
+            done, failed = await mass_ban(interaction.guild, targets, reason)
+        else:
+            done, failed = await mass_kick(interaction.guild, targets, reason)
+    elapsed = time.monotonic() - start
+
+    for user_id in done:
+        bot.modlog.log(interaction.guild_id, verb, user_id, interaction.user.id, reason, mass=True)
+    logger.info(f"Mass {verb} in {interaction.guild_id}: {len(done)} done, {len(failed)} failed in {elapsed:.1f}s")
+
+    description = f"✅ **{len(done)}** user(s) {verb}{'ned' if verb == 'ban' else 'ed'} in {elapsed:.1f}s"
+    if failed:
+        description += f"\n❌ **{len(failed)}** failed (missing permissions, higher role or not a member)"
+    await interaction.edit_original_response(embed=create_embed(f"Mass {verb.title()} Complete", description, discord.Color.green() if not failed else discord.Color.orange()))
+    return done, failed
+
+@bot.tree.command(name="massban", description="Ban many users at once (raid cleanup)")
+@app_commands.describe(
+    ids="User IDs separated by spaces or commas",
+    joined_within="Members who joined in the last N minutes",
+    account_younger_than="Members whose account is younger than N days",
+    reason="Reason for the ban"
+)
+@app_commands.checks.has_permissions(ban_members=True)
+async def massban(interaction: discord.Interaction, ids: str = None, joined_within: app_commands.Range[int, 1, 10080] = None, account_younger_than: app_commands.Range[int, 1, 365] = None, reason: str = "Mass ban"):
+    await run_mass_action(interaction, "ban", ids, joined_within, account_younger_than, reason)
+
+@bot.tree.command(name="masskick", description="Kick many members at once (raid cleanup)")
+@app_commands.describe(
+    ids="User IDs separated by spaces or commas",
+    joined_within="Members who joined in the last N minutes",
+    account_younger_than="Members whose account is younger than N days",
+    reason="Reason for the kick"
+)
+@app_commands.checks.has_permissions(kick_members=True)
+async def masskick(interaction: discord.Interaction, ids: str = None, joined_within: app_commands.Range[int, 1, 10080] = None, account_younger_than: app_commands.Range[int, 1, 365] = None, reason: str = "Mass kick"):
+    await run_mass_action(interaction, "kick", ids, joined_within, account_younger_than, reason)
@@ -0,0 +1,705 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+import discord
+import wavelink
+from discord import app_commands
+from core import bot, create_embed
+from interaction_guard import public_reply
+import responses
+from member_cache import resolve_member
+from track_index import TrackIndex
+from track_search import HedgedSearch
+from recommend import CooccurrenceIndex
+from rest_telemetry import rest_priority, COSMETIC
+
+logger = logging.getLogger(__name__)
+
+# One snapshot file per shard worker so workers don't overwrite each other
+PLAYER_SNAPSHOT_FILE = f"player_snapshot_{os.environ.get('SHARD_WORKER', '0')}.json"
+
+class MusicControlView(discord.ui.View):
+    def __init__(self, player: wavelink.Player):
+        super().__init__(timeout=None)
+        self.player = player
+
+    @discord.ui.button(label="Pause", style=discord.ButtonStyle.secondary, emoji="⏸️")
+    async def toggle_pause(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        if not self.player:
+            return await interaction.followup.send("Player not found.", ephemeral=True)
+
+        if not self.player.playing and not self.player.paused:
+            return await interaction.followup.send("Nothing is playing.", ephemeral=True)
+
+        # Sync state
+        if self.player.paused:
+            await self.player.pause(False)
+            button.label = "Pause"
+            button.emoji = "⏸️"
+            status = "resumed"
+        else:
+            await self.player.pause(True)
+            button.label = "Resume"
+            button.emoji = "▶️"
+            status = "paused"
+
+        with rest_priority(COSMETIC):
+            await interaction.message.edit(view=self)
+        await interaction.followup.send(f"Music {status}!", ephemeral=True)
+
+    @discord.ui.button(label="Vol -", style=discord.ButtonStyle.secondary, emoji="🔉")
+    async def volume_down(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        if not self.player:
+             return await interaction.followup.send("Player not found.", ephemeral=True)
+        current_vol = self.player.volume
+        new_vol = max(0, current_vol - 10)
+        await self.player.set_volume(new_vol)
+        await interaction.followup.send(f"Volume decreased to {new_vol}%", ephemeral=True)
+
+    @discord.ui.button(label="Vol +", style=discord.ButtonStyle.secondary, emoji="🔊")
+    async def volume_up(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        if not self.player:
+             return await interaction.followup.send("Player not found.", ephemeral=True)
+        current_vol = self.player.volume
+        new_vol = min(100, current_vol + 10)
+        await self.player.set_volume(new_vol)
+        await interaction.followup.send(f"Volume increased to {new_vol}%", ephemeral=True)
+
+    @discord.ui.button(label="Skip", style=discord.ButtonStyle.primary, emoji="⏭️")
+    async def skip_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        if not self.player or not self.player.playing:
+            return await interaction.followup.send("Nothing is playing.", ephemeral=True)
+
+        await self.player.skip()
+        await interaction.followup.send("Skipped the song!", ephemeral=True)
+
+    @discord.ui.button(label="Loop", style=discord.ButtonStyle.success, emoji="🔁")
+    async def loop_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        if not self.player or not self.player.playing:
+            return await interaction.followup.send("Nothing is playing.", ephemeral=True)
+
+        if not self.player.queue.mode == wavelink.QueueMode.normal:
+            self.player.queue.mode = wavelink.QueueMode.normal
+            msg = "Looping: **Off** ❌"
+        elif self.player.queue.mode == wavelink.QueueMode.normal:
+            self.player.queue.mode = wavelink.QueueMode.loop
+            msg = "Looping: **Track** 🔂"
+        elif self.player.queue.mode == wavelink.QueueMode.loop:
+            self.player.queue.mode = wavelink.QueueMode.loop_all
+            msg = "Looping: **Queue** 🔁"
+        else:
+            self.player.queue.mode = wavelink.QueueMode.normal
+            msg = "Looping: **Off** ❌"
+
+        await interaction.followup.send(msg, ephemeral=True)
+
+    @discord.ui.button(label="Stop", style=discord.ButtonStyle.danger, emoji="⏹️")
+    async def stop_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        await self.player.disconnect()
+        await interaction.followup.send("Stopped and disconnected!", ephemeral=True)
+
+    @discord.ui.button(label="Queue", style=discord.ButtonStyle.secondary, emoji="📜")
+    async def queue_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        if self.player.queue.is_empty:
+            return await interaction.followup.send("The queue is empty.", ephemeral=True)
+
+        upcoming = list(self.player.queue)[:10]
+        queue_list = []
+        for i, t in enumerate(upcoming):
+            requester = getattr(t, 'requester', None)
+            req_name = requester.name if requester else "Unknown"
+            # Format: Title | Author (Added by: Name)
+            queue_list.append(f"`{i+1}.` **{t.title}** | {t.author} (Added by: {req_name})")
+
+        final_list = "\n".join(queue_list)
+
+        embed = discord.Embed(
+            title="📜 Current Music Queue",
+            description=f"Showing next {len(upcoming)} tracks:\n\n{final_list}",
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Total tracks in queue: {len(self.player.queue)}")
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+async def connect_nodes():
+    node = wavelink.Node(
+        uri='http://ishaan.hidencloud.com:24590',
+        password='KaAs',
+        inactive_player_timeout=300
+    )
+    try:
+        logger.info(f"Connecting to Lavalink: {node.uri}")
+        await wavelink.Pool.connect(nodes=[node], client=bot)
+        logger.info(f"Successfully connected to Lavalink Node: {node.uri}")
+        bot.loop.create_task(restore_players())
+    except Exception as e:
+        logger.error(f"Lavalink Connection Failed for {node.uri}: {e}")
+    # Training can take a while on a big history; music doesn't wait for it
+    bot.loop.create_task(load_autoplay_index())
+
+@bot.event
+async def on_wavelink_node_closed(node: wavelink.Node, disconnected: bool):
+    if disconnected:
+        logger.warning(f"Lavalink Node {node.uri} disconnected. Attempting to reconnect...")
+        try:
+            await node.connect()
+        except Exception as e:
+            logger.error(f"Reconnection to Lavalink Node {node.uri} failed: {e}")
+
+def format_duration(length_ms):
+    seconds = length_ms // 1000
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}" if hours > 0 else f"{minutes:02d}:{seconds:02d}"
+
+def get_track_embed(title, track, color=discord.Color.blue()):
+    # Built fresh on every call: a few microseconds, cheaper than copying a cached one
+    embed = discord.Embed(title=title, description=f"🎶 **{track.title}**", color=color)
+    embed.add_field(name="Author", value=track.author, inline=True)
+    embed.add_field(name="Duration", value=format_duration(track.length), inline=True)
+    if hasattr(track, 'artwork'):
+        embed.set_thumbnail(url=track.artwork)
+    embed.set_footer(text="Powered by Hideout Team")
+    return embed
+
+# Text searches fan out over several sources (see track_search.py); the
+# per-source stats are served on /health
+track_search = bot.track_search = HedgedSearch()
+
+# /play autocomplete: played tracks indexed per guild and globally (see track_index.py)
+guild_track_indexes = {}
+global_track_index = TrackIndex(maxsize=5000)
+GUILD_INDEX_SIZE = 500
+
+def track_choice_key(track):
+    """Autocomplete value for a track: its URI, or an id-based key when the URI doesn't fit Discord's 100 chars."""
+    if track.uri and len(track.uri) <= 100:
+        return track.uri
+    return f"track:{track.identifier}"[:100]
+
+def remember_track(guild_id, track):
+    key = track_choice_key(track)
+    label = f"{track.title} — {track.author}"[:100]
+    if guild_id not in guild_track_indexes:
+        guild_track_indexes[guild_id] = TrackIndex(maxsize=GUILD_INDEX_SIZE)
+    guild_track_indexes[guild_id].add(key, label, track.raw_data)
+    global_track_index.add(key, label, track.raw_data)
+
+def indexed_track(guild_id, key):
+    """A fresh Playable for an autocomplete pick, built from the stored payload (no search). None if unknown."""
+    for index in (guild_track_indexes.get(guild_id), global_track_index):
+        entry = index.entries.get(key) if index else None
+        if entry is not None:
+            return wavelink.Playable(entry.raw)
+    return None
+
+async def play_autocomplete(interaction: discord.Interaction, current: str):
+    choices = []
+    seen = set()
+    # This server's history first, then everyone's
+    for index in (guild_track_indexes.get(interaction.guild_id), global_track_index):
+        if index is None:
+            continue
+        for entry in index.search(current):
+            if entry.key not in seen:
+                seen.add(entry.key)
+                choices.append(app_commands.Choice(name=entry.label, value=entry.key))
+                if len(choices) == 25:
+                    return choices
+    return choices
+
+@bot.event
+async def on_wavelink_track_start(payload: wavelink.TrackStartEventPayload):
+    player: wavelink.Player = payload.player
+    track = payload.track
+    if player.guild:
+        remember_track(player.guild.id, track)
+    player.track_started = time.monotonic()
+
+    # We no longer send a separate embed here if it was triggered by /play 
+    # as /play now handles the initial response to clear the 'thinking' state.
+    # However, for auto-playing next tracks in queue, we might still want it.
+
+    if not hasattr(player, 'controller_message') or player.controller_message is None:
+        if hasattr(player, 'home_channel'):
+            embed = get_track_embed("Now Playing", track)
+            view = MusicControlView(player)
+            player.controller_message = await player.home_channel.send(embed=embed, view=view)
+
+# Local autoplay: co-occurrence of tracks played back to back (see recommend.py),
+# trained from history.db in the background after startup and updated as
+# tracks finish. The index is shared by every server.
+autoplay_index = CooccurrenceIndex()
+autoplay_backlog = None # transitions seen while the index is being trained
+AUTOPLAY_TRAIN_ROWS = 200_000
+
+async def load_autoplay_index():
+    global autoplay_index, autoplay_backlog
+    start = time.perf_counter()
+    autoplay_backlog = []
+    try:
+        rows = await bot.history.sequences(AUTOPLAY_TRAIN_ROWS)
+        index = CooccurrenceIndex()
+        await asyncio.to_thread(index.train, [(r["guild_id"], r["track_id"]) for r in rows])
+    except Exception as e:
+        logger.error(f"Couldn't train autoplay from listening history: {e}")
+        return
+    finally:
+        backlog, autoplay_backlog = autoplay_backlog, None
+    # Replay what finished while training so no live update is lost
+    for previous, track_id in backlog:
+        index.add(previous, track_id)
+    autoplay_index = index
+    logger.info(f"Autoplay index: {len(index)} tracks from {len(rows)} plays in {time.perf_counter() - start:.2f}s")
+
+async def autoplay_next(player):
+    """Picks a follow-up track from the co-occurrence index, or None if it has no suggestion."""
+    recent = list(player.autoplay_recent)
+    for track_id in autoplay_index.recommend(recent, exclude=set(recent), limit=3):
+        uri = await bot.history.track_uri(track_id)
+        if not uri:
+            continue
+        track = indexed_track(player.guild.id, uri)
+        if track is None:
+            try:
+                results = await wavelink.Playable.search(uri)
+            except Exception as e:
+                logger.debug(f"Autoplay couldn't load {uri}: {e}")
+                continue
+            track = results[0] if results else None
+        if track is not None:
+            track.requester = player.guild.me
+            return track
+    return None
+
+def record_play(payload):
+    player = payload.player
+    started = getattr(player, "track_started", None)
+    if started is None or not player.guild:
+        return
+    player.track_started = None
+    skipped = payload.reason != "finished"
+    # Wall-clock time since start (includes pauses), capped at the track length
+    ms_played = payload.track.length if not skipped else min(payload.track.length, (time.monotonic() - started) * 1000)
+    requester = getattr(payload.original, "requester", None)
+    bot.history.record(player.guild.id, payload.track, requester.id if requester else None, ms_played, skipped)
+
+    track_id = payload.track.identifier
+    if not hasattr(player, "autoplay_recent"):
+        player.autoplay_recent = deque(maxlen=20)
+    player.autoplay_recent.append(track_id)
+    if not skipped:
+        previous = getattr(player, "last_finished", None)
+        if previous:
+            autoplay_index.add(previous, track_id)
+            if autoplay_backlog is not None:
+                autoplay_backlog.append((previous, track_id))
+        player.last_finished = track_id
+
+@bot.event
+async def on_wavelink_track_end(payload: wavelink.TrackEndEventPayload):
+    player: wavelink.Player = payload.player
+    if player:
+        record_play(payload)
+
+    # Delete the old control panel
+    if hasattr(player, 'controller_message') and player.controller_message:
+        try:
+            with rest_priority(COSMETIC):
+                await player.controller_message.delete()
+        except:
+            pass
+        player.controller_message = None
+
+    # Wavelink 3.x handles QueueMode automatically. 
+    # If a song ends and queue is not empty, it will play the next one if mode is normal/loop_all.
+    # If mode is loop, it will replay the current one.
+
+    if getattr(player, "local_autoplay", False) and payload.reason in ("finished", "stopped") \
+            and player.queue.is_empty and player.queue.mode == wavelink.QueueMode.normal:
+        track = await autoplay_next(player)
+        if track is not None:
+            await player.play(track)
+            return
+
+    if player.queue.is_empty and player.queue.mode == wavelink.QueueMode.normal:
+        # 10 second auto-leave only if nothing else is playing/queued
+        await asyncio.sleep(10)
+        if not player.playing and player.queue.is_empty:
+            await player.disconnect()
+            if hasattr(player, 'home_channel'):
+                await player.home_channel.send(embed=responses.QUEUE_ENDED)
+
+@public_reply
+@bot.tree.command(name="play", description="Play music or add to queue")
+@app_commands.autocomplete(search=play_autocomplete)
+async def play(interaction: discord.Interaction, search: str):
+    if not interaction.user.voice:
+        return await interaction.response.send_message(embed=responses.JOIN_VOICE_FIRST)
+
+    await interaction.response.defer()
+    try:
+        vc: wavelink.Player = interaction.guild.voice_client or await interaction.user.voice.channel.connect(cls=wavelink.Player)
+        vc.home_channel = interaction.channel
+
+        # A picked suggestion is played as-is; anything typed is searched
+        track = indexed_track(interaction.guild_id, search)
+        tracks = [track] if track else await track_search.search(search)
+        if not tracks:
+            # Fix thinking state
+            return await interaction.followup.send(embed=create_embed("Not Found", f"No tracks found for: `{search}`", discord.Color.orange()))
+
+        track = tracks[0]
+        # Attach the requester to the track object
+        track.requester = interaction.user
+
+        # Deafen the bot when joining
+        if not interaction.guild.voice_client:
+            try:
+                vc: wavelink.Player = await interaction.user.voice.channel.connect(cls=wavelink.Player, self_deaf=True)
+            except asyncio.TimeoutError:
+                return await interaction.followup.send(embed=responses.CONNECTION_TIMEOUT)
+        else:
+            vc: wavelink.Player = interaction.guild.voice_client
+
+        vc.home_channel = interaction.channel
+
+        if vc.playing:
+            await vc.queue.put_wait(track)
+            await interaction.followup.send(embed=get_track_embed("Added to Queue", track, discord.Color.green()))
+        else:
+            await vc.play(track)
+            embed = get_track_embed("Playing Now", track, discord.Color.green())
+            # Fix thinking state: acknowledge the play command with the actual track info
+            await interaction.followup.send(embed=embed)    
+    except Exception as e:
+        # Fix thinking state
+        await interaction.followup.send(embed=create_embed("Error", f"An error occurred: `{str(e)}`", discord.Color.red()))
+
+@public_reply
+@bot.tree.command(name="volume", description="Adjust music volume (0-100)")
+async def volume(interaction: discord.Interaction, level: int):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.NOT_CONNECTED)
+
+    if not 0 <= level <= 100:
+        return await interaction.response.send_message(embed=responses.INVALID_VOLUME)
+
+    await vc.set_volume(level)
+    await interaction.response.send_message(embed=create_embed("Volume Updated", f"🔊 Volume has been set to **{level}%**", discord.Color.blue()))
+
+@public_reply
+@bot.tree.command(name="join", description="Join your current voice channel")
+async def join(interaction: discord.Interaction):
+    if not interaction.user.voice:
+        return await interaction.response.send_message(embed=responses.JOIN_VOICE_FIRST)
+
+    try:
+        await interaction.user.voice.channel.connect(cls=wavelink.Player, self_deaf=True)
+        await interaction.response.send_message(embed=create_embed("Joined", f"✅ Connected to **{interaction.user.voice.channel.name}** (Deafened)", discord.Color.green()))
+    except Exception as e:
+        await interaction.response.send_message(embed=create_embed("Error", f"Could not connect: `{e}`", discord.Color.red()))
+
+@public_reply
+@bot.tree.command(name="filter", description="Apply audio filters")
+@app_commands.describe(name="The filter to apply")
+@app_commands.choices(name=[
+    app_commands.Choice(name="Bassboost", value="bassboost"),
+    app_commands.Choice(name="Nightcore", value="nightcore"),
+    app_commands.Choice(name="8D", value="8d"),
+    app_commands.Choice(name="Clear", value="clear")
+])
+async def filter_cmd(interaction: discord.Interaction, name: app_commands.Choice[str]):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.NOT_CONNECTED_JOIN_FIRST)
+
+    filters = wavelink.Filters()
+    filter_name = name.value
+
+    if filter_name == "bassboost":
+        filters.equalizer = wavelink.Equalizer.boost()
+        msg = "🎸 **Bassboost** filter applied!"
+    elif filter_name == "nightcore":
+        filters.timescale.set(pitch=1.2, speed=1.2, rate=1.0)
+        msg = "💨 **Nightcore** filter applied!"
+    elif filter_name == "8d":
+        # Fixed 8D logic: use low frequency oscillation on panning
+        # wavelink rotation filter rotates the audio 360 degrees
+        filters.rotation.set(rotation_hz=0.2)
+        msg = "🌀 **8D Audio** filter applied!"
+    elif filter_name == "clear":
+        filters = wavelink.Filters()
+        msg = "✨ Audio filters **cleared**!"
+
+    await vc.set_filters(filters)
+    await interaction.response.send_message(embed=create_embed("Filter Applied", msg, discord.Color.blue()))
+
+@public_reply
+@bot.tree.command(name="skip", description="Skip the current song")
+async def skip(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if vc and (vc.playing or not vc.queue.is_empty):
+        await vc.skip()
+        await interaction.response.send_message(embed=responses.SKIPPED)
+    else:
+        await interaction.response.send_message(embed=responses.NOTHING_TO_SKIP)
+
+@public_reply
+@bot.tree.command(name="queue", description="Show the current music queue")
+async def queue(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc or (not vc.playing and vc.queue.is_empty):
+        return await interaction.response.send_message(embed=responses.QUEUE_EMPTY)
+
+    description = ""
+    if vc.playing:
+        description += f"**Currently Playing:**\n{vc.current.title}\n\n"
+
+    if not vc.queue.is_empty:
+        description += "**Up Next:**\n"
+        for i, t in enumerate(vc.queue):
+            description += f"{i+1}. {t.title}\n"
+            if i >= 9:
+                description += f"... and {len(vc.queue) - 10} more"
+                break
+
+    await interaction.response.send_message(embed=create_embed("Music Queue", description or "Nothing in queue."))
+
+@public_reply
+@bot.tree.command(name="stop", description="Stop music and clear queue")
+async def stop(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if vc:
+        await vc.stop()
+        vc.queue.clear()
+        await interaction.response.send_message(embed=responses.STOPPED)
+    else:
+        await interaction.response.send_message(embed=responses.NOT_CONNECTED)
+
+@public_reply
+@bot.tree.command(name="leave", description="Make the bot leave the voice channel")
+async def leave(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if vc:
+        await vc.disconnect()
+        await interaction.response.send_message(embed=responses.LEFT_VOICE)
+    else:
+        await interaction.response.send_message(embed=responses.NOT_CONNECTED)
+
+@public_reply
+@bot.tree.command(name="loop", description="Toggle loop mode for the current track or queue")
+@app_commands.describe(mode="Loop mode (off, track, queue)")
+@app_commands.choices(mode=[
+    app_commands.Choice(name="Off", value="off"),
+    app_commands.Choice(name="Track", value="track"),
+    app_commands.Choice(name="Queue", value="queue")
+])
+async def loop(interaction: discord.Interaction, mode: app_commands.Choice[str]):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.NOT_CONNECTED)
+
+    if mode.value == "off":
+        vc.queue.loop = False
+        vc.queue.loop_all = False
+        msg = "Looping is now **disabled**."
+    elif mode.value == "track":
+        vc.queue.loop = True
+        vc.queue.loop_all = False
+        msg = "Now looping the **current track**."
+    elif mode.value == "queue":
+        vc.queue.loop = False
+        vc.queue.loop_all = True
+        msg = "Now looping the **entire queue**."
+
+    await interaction.response.send_message(embed=create_embed("Loop Updated", f"🔁 {msg}", discord.Color.blue()))
+
+@public_reply
+@bot.tree.command(name="stay", description="Toggle 24/7 mode (prevent bot from leaving)")
+async def stay(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.NOT_CONNECTED)
+
+    # Simple toggle for wavelink player's behavior if supported or just simulate
+    if hasattr(vc, 'stay_247') and vc.stay_247:
+        vc.stay_247 = False
+        msg = "24/7 mode **disabled**."
+    else:
+        vc.stay_247 = True
+        msg = "24/7 mode **enabled**."
+
+    await interaction.response.send_message(embed=create_embed("24/7 Mode", f"🕒 {msg}", discord.Color.blue()))
+
+@public_reply
+@bot.tree.command(name="pause", description="Pause the current music")
+async def pause(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.BOT_NOT_IN_VOICE)
+
+    if not vc.playing and not vc.paused:
+        return await interaction.response.send_message(embed=responses.NOTHING_PLAYING)
+
+    if vc.paused:
+        return await interaction.response.send_message(embed=responses.ALREADY_PAUSED)
+
+    await vc.pause(True)
+
+    # Update control panel if it exists
+    if hasattr(vc, 'controller_message') and vc.controller_message:
+        view = MusicControlView(vc)
+        for item in view.children:
+            if isinstance(item, discord.ui.Button) and item.label in ["Pause", "Resume"]:
+                item.label = "Resume"
+                item.emoji = "▶️"
+        try:
+            with rest_priority(COSMETIC):
+                await vc.controller_message.edit(view=view)
+        except:
+            pass
+
+    await interaction.response.send_message(embed=responses.PAUSED)
+
+@public_reply
+@bot.tree.command(name="resume", description="Resume the current music")
+async def resume(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.BOT_NOT_IN_VOICE)
+
+    if not vc.paused:
+        return await interaction.response.send_message(embed=responses.NOT_PAUSED)
+
+    await vc.pause(False)
+
+    # Update control panel if it exists
+    if hasattr(vc, 'controller_message') and vc.controller_message:
+        view = MusicControlView(vc)
+        for item in view.children:
+            if isinstance(item, discord.ui.Button) and item.label in ["Pause", "Resume"]:
+                item.label = "Pause"
+                item.emoji = "⏸️"
+        try:
+            with rest_priority(COSMETIC):
+                await vc.controller_message.edit(view=view)
+        except:
+            pass
+
+    await interaction.response.send_message(embed=responses.RESUMED)
+
+@public_reply
+@bot.tree.command(name="autoplay", description="Toggle autoplay: keep playing related tracks when the queue ends")
+async def autoplay(interaction: discord.Interaction):
+    vc: wavelink.Player = interaction.guild.voice_client
+    if not vc:
+        return await interaction.response.send_message(embed=responses.NOT_CONNECTED)
+
+    vc.local_autoplay = not getattr(vc, "local_autoplay", False)
+    if vc.local_autoplay:
+        msg = "📻 Autoplay is now **On**. When the queue ends I'll pick tracks that listeners often play after these."
+    else:
+        msg = "📻 Autoplay is now **Off**."
+    await interaction.response.send_message(embed=create_embed("Autoplay", msg, discord.Color.blue()))
+
+@public_reply
+@bot.tree.command(name="stats", description="Music stats: top tracks, top listeners and hours played")
+@app_commands.describe(scope="This server or every server")
+@app_commands.choices(scope=[
+    app_commands.Choice(name="This Server", value="server"),
+    app_commands.Choice(name="Global", value="global")
+])
+async def stats(interaction: discord.Interaction, scope: app_commands.Choice[str] = None):
+    await interaction.response.defer()
+    # Plays still waiting in the write buffer should count
+    await bot.history.flush()
+    guild_id = 0 if scope and scope.value == "global" else interaction.guild_id
+    totals = await bot.history.totals(guild_id)
+    if totals is None:
+        return await interaction.followup.send(embed=create_embed("📊 Music Stats", "Nothing has been played yet.", discord.Color.blue()))
+    tracks = await bot.history.top_tracks(guild_id)
+    requesters = await bot.history.top_requesters(guild_id)
+
+    embed = create_embed(
+        "📊 Music Stats" + (" (Global)" if guild_id == 0 else ""),
+        f"**{totals['ms_played'] / 3_600_000:.1f}** hours played across **{totals['plays']}** tracks "
+        f"({totals['skips'] / totals['plays']:.0%} skipped)",
+        discord.Color.blue()
+    )
+    embed.add_field(
+        name="Top Tracks",
+        value="\n".join(f"`{i+1}.` **{t['title']}** | {t['author']} ({t['plays']} plays)" for i, t in enumerate(tracks))[:1024] or "None",
+        inline=False
+    )
+    embed.add_field(
+        name="Top Listeners",
+        value="\n".join(f"`{i+1}.` <@{r['user_id']}> — {r['plays']} plays, {r['ms_played'] / 3_600_000:.1f}h" for i, r in enumerate(requesters)) or "None",
+        inline=False
+    )
+    await interaction.followup.send(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+def snapshot_players():
+    """Saves every active player (track, position, queue, volume) so it can resume after a restart."""
+    snapshot = []
+    for vc in bot.voice_clients:
+        if not isinstance(vc, wavelink.Player) or not vc.channel:
+            continue
+        current = vc.current
+        requester = getattr(current, 'requester', None) if current else None
+        snapshot.append({
+            "guild_id": vc.guild.id,
+            "channel_id": vc.channel.id,
+            "home_channel_id": vc.home_channel.id if getattr(vc, 'home_channel', None) else None,
+            "volume": vc.volume,
+            "paused": vc.paused,
+            "position": vc.position,
+            "current": current.raw_data if current else None,
+            "requester_id": requester.id if requester else None,
+            "queue": [t.raw_data for t in vc.queue],
+        })
+    with open(PLAYER_SNAPSHOT_FILE, 'w') as f:
+        json.dump(snapshot, f)
+    logger.info(f"Saved {len(snapshot)} player(s) to {PLAYER_SNAPSHOT_FILE}")
+
+async def restore_players():
+    if not os.path.exists(PLAYER_SNAPSHOT_FILE):
+        return
+    try:
+        with open(PLAYER_SNAPSHOT_FILE, 'r') as f:
+            snapshot = json.load(f)
+        os.remove(PLAYER_SNAPSHOT_FILE)
+    except Exception as e:
+        logger.error(f"Error loading player snapshot: {e}")
+        return
+
+    await bot.wait_until_ready()
+    for entry in snapshot:
+        guild = bot.get_guild(entry["guild_id"])
+        channel = guild.get_channel(entry["channel_id"]) if guild else None
+        if not channel or guild.voice_client or not entry["current"]:
+            continue
+        try:
+            vc: wavelink.Player = await channel.connect(cls=wavelink.Player, self_deaf=True)
+            if entry["home_channel_id"]:
+                vc.home_channel = guild.get_channel(entry["home_channel_id"])
+            track = wavelink.Playable(entry["current"])
+            track.requester = await resolve_member(bot, guild, entry["requester_id"]) if entry["requester_id"] else None
+            for data in entry["queue"]:
+                vc.queue.put(wavelink.Playable(data))
+            await vc.play(track, start=entry["position"], volume=entry["volume"], paused=entry["paused"])
+            logger.info(f"Restored player in guild {guild.id}")
+        except Exception as e:
+            logger.error(f"Failed to restore player in guild {entry['guild_id']}: {e}")
@@ -0,0 +1,207 @@
+import re
+import json
+import time
+import asyncio
+import datetime
+import logging
+import discord
+from discord import app_commands
+from core import bot, create_embed, serves_guild
+from interaction_guard import public_reply
+from rest_telemetry import rest_priority, COSMETIC
+
+logger = logging.getLogger(__name__)
+
+# Button polls. Tallies live in memory: each poll keeps a user -> option dict
+# and a count per option, so a vote is O(1) and one vote per user is enforced
+# without touching Discord. The poll message is re-rendered at most once per
+# POLL_UPDATE_DELAY seconds however many votes arrive, and votes are
+# persisted in batches through bot.poll_store. Buttons are DynamicItems whose
+# custom_id carries the poll id and option, so they keep working after a
+# restart without re-registering a view per message.
+
+POLL_MAX_OPTIONS = 25
+POLL_UPDATE_DELAY = 3.0
+BAR_LENGTH = 10
+
+class Poll:
+    def __init__(self, poll_id, guild_id, channel_id, author_id, question, options, ends_at=None, message_id=None):
+        self.poll_id = poll_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.author_id = author_id
+        self.question = question
+        self.options = options
+        self.ends_at = ends_at
+        self.counts = [0] * len(options)
+        self.voters = {} # user_id -> option index
+        self.closed = False
+        self.update_task = None
+
+    def vote(self, user_id, option):
+        """Sets the user's vote; voting for the current choice again removes it. Returns the new choice (or None)."""
+        previous = self.voters.get(user_id)
+        if previous is not None:
+            self.counts[previous] -= 1
+        if previous == option:
+            del self.voters[user_id]
+            return None
+        self.voters[user_id] = option
+        self.counts[option] += 1
+        return option
+
+polls = {} # poll_id -> open Poll
+_loaded = False
+_load_lock = asyncio.Lock()
+
+def build_poll_embed(poll):
+    total = len(poll.voters)
+    lines = [f"**{poll.question}**\n"]
+    for i, (option, count) in enumerate(zip(poll.options, poll.counts)):
+        share = count / total if total else 0
+        filled = round(share * BAR_LENGTH)
+        lines.append(f"`{i + 1}.` {option}\n`{'█' * filled}{'░' * (BAR_LENGTH - filled)}` {count} ({share:.0%})")
+    title = "📊 Poll Closed" if poll.closed else "📊 Server Poll"
+    embed = create_embed(title, "\n".join(lines)[:4096], discord.Color.dark_grey() if poll.closed else discord.Color.blue())
+    footer = f"{total} vote{'s' if total != 1 else ''}"
+    if poll.ends_at and not poll.closed:
+        footer += " • ends"
+        embed.timestamp = datetime.datetime.fromtimestamp(poll.ends_at, tz=datetime.timezone.utc)
+    embed.set_footer(text=footer)
+    return embed
+
+def build_poll_view(poll):
+    view = discord.ui.View(timeout=None)
+    for i, option in enumerate(poll.options):
+        view.add_item(PollButton(poll.poll_id, i, f"{i + 1}. {option}"[:80], disabled=poll.closed))
+    return view
+
+class PollButton(discord.ui.DynamicItem[discord.ui.Button], template=r"poll:(?P<poll_id>\d+):(?P<option>\d+)"):
+    def __init__(self, poll_id, option, label, disabled=False):
+        super().__init__(discord.ui.Button(
+            label=label, style=discord.ButtonStyle.secondary,
+            custom_id=f"poll:{poll_id}:{option}", disabled=disabled
+        ))
+        self.poll_id = poll_id
+        self.option = option
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["poll_id"]), int(match["option"]), item.label)
+
+    async def callback(self, interaction: discord.Interaction):
+        await ensure_polls_loaded()
+        poll = polls.get(self.poll_id)
+        if poll is None or poll.closed or self.option >= len(poll.options):
+            return await interaction.response.send_message("This poll has ended.", ephemeral=True)
+
+        choice = poll.vote(interaction.user.id, self.option)
+        bot.poll_store.vote(poll.poll_id, interaction.user.id, choice)
+        schedule_poll_update(poll)
+        if choice is None:
+            msg = "Your vote was removed."
+        else:
+            msg = f"You voted for **{poll.options[choice]}**."
+        await interaction.response.send_message(msg, ephemeral=True)
+
+bot.add_dynamic_items(PollButton)
+
+def schedule_poll_update(poll):
+    # Debounce: one pending edit per poll picks up every vote cast before it runs
+    if poll.update_task is None or poll.update_task.done():
+        poll.update_task = asyncio.create_task(update_poll_later(poll))
+
+async def update_poll_later(poll):
+    await asyncio.sleep(POLL_UPDATE_DELAY)
+    poll.update_task = None
+    await edit_poll_message(poll)
+
+async def edit_poll_message(poll, view=None):
+    if poll.message_id is None:
+        return
+    message = bot.get_partial_messageable(poll.channel_id).get_partial_message(poll.message_id)
+    try:
+        if view is None:
+            # Live tally refreshes can wait for moderation; the final edit can't
+            with rest_priority(COSMETIC):
+                await message.edit(embed=build_poll_embed(poll))
+        else:
+            await message.edit(embed=build_poll_embed(poll), view=view)
+    except discord.HTTPException as e:
+        logger.warning(f"Couldn't update poll {poll.poll_id}: {e}")
+
+async def close_poll(poll):
+    poll.closed = True
+    polls.pop(poll.poll_id, None)
+    if poll.update_task:
+        poll.update_task.cancel()
+    bot.poll_store.close_poll(poll.poll_id)
+    await edit_poll_message(poll, view=build_poll_view(poll))
+
+async def close_poll_later(poll):
+    await asyncio.sleep(max(0, poll.ends_at - time.time()))
+    if not poll.closed:
+        await close_poll(poll)
+
+async def ensure_polls_loaded():
+    global _loaded
+    if _loaded:
+        return
+    async with _load_lock:
+        if _loaded:
+            return
+        for row, votes in await bot.poll_store.load_open():
+            # Other shard workers own the rest; only the owner may close and edit a poll
+            if not serves_guild(row["guild_id"]):
+                continue
+            poll = Poll(row["poll_id"], row["guild_id"], row["channel_id"], row["author_id"], row["question"],
+                        json.loads(row["options"]), row["ends_at"], row["message_id"])
+            for user_id, option in votes:
+                if option < len(poll.options):
+                    poll.voters[user_id] = option
+                    poll.counts[option] += 1
+            polls[poll.poll_id] = poll
+            if poll.ends_at:
+                asyncio.create_task(close_poll_later(poll))
+        _loaded = True
+        logger.info(f"Loaded {len(polls)} open poll(s)")
+
+@bot.listen("on_ready")
+async def load_polls_on_ready():
+    # Timed polls need their close timers back even if nobody votes
+    await ensure_polls_loaded()
+
+@public_reply
+@bot.tree.command(name="poll", description="Create a poll with up to 25 options")
+@app_commands.describe(question="The question to ask", options="Options separated by | (e.g. Pizza | Burgers | Tacos)", duration="Close the poll automatically after this many minutes")
+async def poll(interaction: discord.Interaction, question: str, options: str, duration: app_commands.Range[int, 1, 10080] = None):
+    choices = [o.strip() for o in options.split("|") if o.strip()]
+    if not 2 <= len(choices) <= POLL_MAX_OPTIONS:
+        return await interaction.response.send_message(f"Give between 2 and {POLL_MAX_OPTIONS} options separated by `|`.", ephemeral=True)
+    await ensure_polls_loaded()
+
+    new_poll = Poll(
+        interaction.id, interaction.guild_id, interaction.channel_id, interaction.user.id, question[:256],
+        [c[:100] for c in choices], time.time() + duration * 60 if duration else None
+    )
+    polls[new_poll.poll_id] = new_poll
+    await interaction.response.send_message(embed=build_poll_embed(new_poll), view=build_poll_view(new_poll))
+    message = await interaction.original_response()
+    new_poll.message_id = message.id
+    bot.poll_store.create(new_poll)
+    if new_poll.ends_at:
+        asyncio.create_task(close_poll_later(new_poll))
+
+@bot.tree.command(name="endpoll", description="Close a poll and show the final results")
+@app_commands.describe(message="The poll's message ID or link")
+async def endpoll(interaction: discord.Interaction, message: str):
+    await ensure_polls_loaded()
+    ids = re.findall(r"\d+", message)
+    target = next((p for p in polls.values() if ids and p.message_id == int(ids[-1])), None)
+    if target is None:
+        return await interaction.response.send_message("No open poll found for that message.", ephemeral=True)
+    if target.author_id != interaction.user.id and not interaction.user.guild_permissions.manage_messages:
+        return await interaction.response.send_message("Only the poll's creator or a moderator can close it.", ephemeral=True)
+    await close_poll(target)
+    await interaction.response.send_message(embed=create_embed("📊 Poll Closed", f"**{target.question}** has been closed with {len(target.voters)} vote(s).", discord.Color.green()), ephemeral=True)
@@ -0,0 +1,259 @@
+import re
+import time
+import json
+import asyncio
+import datetime
+import logging
+from collections import deque
+import discord
+from discord import app_commands
+from core import bot, create_embed
+from features.moderation import run_mass_action
+from rest_telemetry import rest_priority, CRITICAL, NORMAL
+
+logger = logging.getLogger(__name__)
+
+# Raid detection. Every join goes through a per-guild sliding window that
+# keeps running counts (joins, suspicious joins, joins per name "skeleton"),
+# so each join is O(1) amortized and needs no REST call. When the window
+# looks like a raid the guild is put into lockdown: verification goes to the
+# highest level and invites are paused, and the suspicious accounts are kept
+# for /raidban.
+
+RAID_CONFIG_FILE = "raid_config.json"
+NEW_ACCOUNT_DAYS = 7
+LOCKDOWN_MINUTES = 15
+MAX_FLAGGED = 1000
+
+def load_raid_config():
+    try:
+        with open(RAID_CONFIG_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_raid_config():
+    with open(RAID_CONFIG_FILE, "w") as f:
+        json.dump(raid_config, f)
+
+# Loaded once; /raidprotect keeps it in sync with the file
+raid_config = load_raid_config()
+
+def name_skeleton(name):
+    """"raider_123", "Raider-77" and "raider" all map to "raider"."""
+    return re.sub(r"[^a-z]+", "", name.lower())
+
+class JoinRateDetector:
+    def __init__(self, joins, seconds):
+        self.threshold = joins
+        self.window = seconds
+        self.joins = deque() # (timestamp, member_id, suspicious, skeleton)
+        self.suspicious = 0
+        self.skeletons = {}
+        self.flagged = {}
+        self.raiding = False
+        self.lockdown_until = 0.0
+
+    def _evict(self, now):
+        while self.joins and self.joins[0][0] < now - self.window:
+            _, _, suspicious, skeleton = self.joins.popleft()
+            self.suspicious -= suspicious
+            count = self.skeletons[skeleton] - 1
+            if count:
+                self.skeletons[skeleton] = count
+            else:
+                del self.skeletons[skeleton]
+
+    def add(self, member, now):
+        """Records a join. Returns True when the window currently looks like a raid."""
+        self._evict(now)
+
+        skeleton = name_skeleton(member.name)
+        score = 0
+        if discord.utils.utcnow() - member.created_at < datetime.timedelta(days=NEW_ACCOUNT_DAYS):
+            score += 1
+        if member.avatar is None:
+            score += 1
+        if len(skeleton) >= 3 and self.skeletons.get(skeleton, 0) >= 2:
+            score += 1
+        suspicious = score >= 2
+
+        self.joins.append((now, member.id, suspicious, skeleton))
+        self.suspicious += suspicious
+        self.skeletons[skeleton] = self.skeletons.get(skeleton, 0) + 1
+
+        is_raid = len(self.joins) >= self.threshold and (
+            self.suspicious * 2 >= len(self.joins) or len(self.joins) >= self.threshold * 3
+        )
+        if suspicious and (is_raid or self.in_lockdown(now)) and len(self.flagged) < MAX_FLAGGED:
+            self.flagged[member.id] = now
+        if is_raid and not self.raiding:
+            # The window just turned into a raid: everything suspicious already
+            # in it is part of the wave. Later joins are flagged one at a time above.
+            for _, member_id, was_suspicious, _ in self.joins:
+                if was_suspicious and len(self.flagged) < MAX_FLAGGED:
+                    self.flagged.setdefault(member_id, now)
+        self.raiding = is_raid
+        return is_raid
+
+    def in_lockdown(self, now):
+        return now < self.lockdown_until
+
+detectors = {}
+lockdown_tasks = {}
+
+def get_detector(guild_id):
+    settings = raid_config.get(str(guild_id))
+    if not settings or not settings.get("enabled"):
+        return None
+    detector = detectors.get(guild_id)
+    if detector is None or (detector.threshold, detector.window) != (settings["joins"], settings["seconds"]):
+        previous = detector
+        detector = detectors[guild_id] = JoinRateDetector(settings["joins"], settings["seconds"])
+        if previous is not None:
+            # New thresholds start a fresh window, but a running lockdown and its flagged accounts carry over
+            detector.lockdown_until = previous.lockdown_until
+            detector.flagged = previous.flagged
+    return detector
+
+async def start_lockdown(guild, detector):
+    settings = raid_config[str(guild.id)]
+    until = discord.utils.utcnow() + datetime.timedelta(minutes=LOCKDOWN_MINUTES)
+    detector.lockdown_until = time.monotonic() + LOCKDOWN_MINUTES * 60
+    if "previous_verification" not in settings:
+        settings["previous_verification"] = guild.verification_level.value
+        save_raid_config()
+
+    try:
+        await guild.edit(
+            verification_level=discord.VerificationLevel.highest,
+            invites_disabled_until=until,
+            reason="Raid detected: automatic lockdown"
+        )
+    except discord.HTTPException as e:
+        logger.error(f"Raid lockdown failed in {guild.id}: {e}")
+    bot.modlog.log(guild.id, "raid_lockdown", None, bot.user.id, "Join rate raid detected", flagged=len(detector.flagged))
+    logger.warning(f"Raid detected in {guild.id}: lockdown until {until.isoformat()}, {len(detector.flagged)} flagged")
+
+    channel = guild.system_channel
+    if channel and channel.permissions_for(guild.me).send_messages:
+        try:
+            await channel.send(embed=create_embed(
+                "🚨 Raid Detected",
+                f"Unusual join activity detected. The server is in lockdown for {LOCKDOWN_MINUTES} minutes "
+                f"(highest verification level, invites paused).\n"
+                f"**{len(detector.flagged)}** suspicious account(s) flagged. Moderators can use `/raidban` to ban them "
+                f"or `/endlockdown` to lift the lockdown.",
+                discord.Color.red()
+            ))
+        except discord.HTTPException:
+            pass
+
+    if guild.id not in lockdown_tasks:
+        lockdown_tasks[guild.id] = asyncio.create_task(lockdown_timer(guild.id))
+
+async def lockdown_timer(guild_id):
+    # New raid waves push lockdown_until forward, so keep sleeping until it's quiet.
+    # The task is started from start_lockdown and inherits its CRITICAL priority;
+    # lifting the lockdown is ordinary work, so it runs at NORMAL.
+    try:
+        while True:
+            detector = detectors.get(guild_id)
+            remaining = detector.lockdown_until - time.monotonic() if detector else 0
+            if remaining <= 0:
+                break
+            await asyncio.sleep(remaining)
+        guild = bot.get_guild(guild_id)
+        if guild:
+            with rest_priority(NORMAL):
+                await end_lockdown(guild)
+    finally:
+        lockdown_tasks.pop(guild_id, None)
+
+async def end_lockdown(guild):
+    settings = raid_config.get(str(guild.id), {})
+    detector = detectors.get(guild.id)
+    if detector:
+        detector.lockdown_until = 0.0
+        detector.flagged.clear() # the next raid starts a fresh list
+    previous = settings.pop("previous_verification", None)
+    save_raid_config()
+    try:
+        kwargs = {"invites_disabled_until": None}
+        if previous is not None:
+            kwargs["verification_level"] = discord.VerificationLevel(previous)
+        await guild.edit(reason="Raid lockdown lifted", **kwargs)
+    except discord.HTTPException as e:
+        logger.error(f"Failed to lift raid lockdown in {guild.id}: {e}")
+    bot.modlog.log(guild.id, "raid_lockdown_end", None, bot.user.id)
+
+@bot.listen("on_member_join")
+async def raid_member_join(member):
+    detector = get_detector(member.guild.id)
+    if detector is None:
+        return
+    now = time.monotonic()
+    if detector.add(member, now):
+        if detector.in_lockdown(now):
+            detector.lockdown_until = now + LOCKDOWN_MINUTES * 60
+        else:
+            with rest_priority(CRITICAL):
+                await start_lockdown(member.guild, detector)
+
+@bot.tree.command(name="raidprotect", description="Configure automatic raid detection and lockdown")
+@app_commands.describe(status="Enable or disable raid protection", joins="Joins within the window that count as a raid", seconds="Length of the join window in seconds")
+@app_commands.choices(status=[
+    app_commands.Choice(name="Enable", value="on"),
+    app_commands.Choice(name="Disable", value="off")
+])
+@app_commands.checks.has_permissions(administrator=True)
+async def raidprotect(interaction: discord.Interaction, status: app_commands.Choice[str], joins: app_commands.Range[int, 3, 100] = 10, seconds: app_commands.Range[int, 5, 600] = 10):
+    settings = raid_config.setdefault(str(interaction.guild_id), {})
+    settings.update({"enabled": status.value == "on", "joins": joins, "seconds": seconds})
+    save_raid_config()
+    if status.value == "off":
+        detectors.pop(interaction.guild_id, None)
+        msg = "Raid protection has been **disabled**."
+    else:
+        msg = (f"Raid protection has been **enabled**: **{joins}** joins within **{seconds}s**, mostly from new, "
+               f"avatar-less or look-alike accounts, trigger a {LOCKDOWN_MINUTES} minute lockdown.")
+    await interaction.response.send_message(embed=create_embed("🛡️ Raid Protection", msg, discord.Color.green() if status.value == "on" else discord.Color.red()), ephemeral=True)
+
+@bot.tree.command(name="raidstatus", description="Show raid detection stats for this server")
+@app_commands.checks.has_permissions(ban_members=True)
+async def raidstatus(interaction: discord.Interaction):
+    detector = get_detector(interaction.guild_id)
+    if detector is None:
+        return await interaction.response.send_message("Raid protection is not enabled. Use `/raidprotect` first.", ephemeral=True)
+    now = time.monotonic()
+    detector._evict(now)
+    description = (
+        f"**Joins in the last {detector.window}s:** {len(detector.joins)} ({detector.suspicious} suspicious)\n"
+        f"**Raid threshold:** {detector.threshold} joins\n"
+        f"**Lockdown:** {'active' if detector.in_lockdown(now) else 'off'}\n"
+        f"**Flagged accounts:** {len(detector.flagged)}"
+    )
+    await interaction.response.send_message(embed=create_embed("🛡️ Raid Status", description, discord.Color.blue()), ephemeral=True)
+
+@bot.tree.command(name="raidban", description="Ban the accounts flagged during a raid")
+@app_commands.checks.has_permissions(ban_members=True)
+async def raidban(interaction: discord.Interaction):
+    detector = detectors.get(interaction.guild_id)
+    if not detector or not detector.flagged:
+        return await interaction.response.send_message("No flagged raid accounts.", ephemeral=True)
+    flagged = list(detector.flagged)
+    result = await run_mass_action(interaction, "ban", " ".join(map(str, flagged)), None, None, "Raid cleanup")
+    if result is not None:
+        # Handled (banned or not bannable): don't offer them again. Accounts flagged meanwhile stay.
+        for member_id in flagged:
+            detector.flagged.pop(member_id, None)
+
+@bot.tree.command(name="endlockdown", description="Lift a raid lockdown now")
+@app_commands.checks.has_permissions(manage_guild=True)
+async def endlockdown(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True)
+    task = lockdown_tasks.pop(interaction.guild_id, None)
+    if task:
+        task.cancel()
+    await end_lockdown(interaction.guild)
+    await interaction.followup.send(embed=create_embed("🔓 Lockdown Lifted", "Verification level restored and invites re-enabled.", discord.Color.green()), ephemeral=True)
@@ -0,0 +1,177 @@
+import os
+import time
+import asyncio
+import datetime
+import logging
+import discord
+from discord import app_commands
+from core import bot, create_embed
+from features.ai import complete
+
+logger = logging.getLogger(__name__)
+
+# Channel summaries ("what did I miss?"). History is streamed page by page
+# (discord.py fetches 100 messages per request) and packed into chunks of at
+# most CHUNK_TOKENS estimated tokens. A chunk is handed to the AI as soon as
+# it is full, with at most AI_SUMMARY_CONCURRENCY calls running at once across
+# all summaries in progress, so fetching and summarizing overlap. The partial summaries are then merged,
+# in rounds if they don't fit in one prompt, into the final summary.
+
+CHUNK_TOKENS = 3000
+CHARS_PER_TOKEN = 4 # rough estimate, good enough for sizing prompts
+PART_SUMMARY_TOKENS = 400
+FINAL_SUMMARY_TOKENS = 900
+MAX_LINE_CHARS = 500
+SUMMARY_CONCURRENCY = int(os.environ.get("AI_SUMMARY_CONCURRENCY", "5"))
+PROGRESS_INTERVAL = 2.0
+
+# Shared by every SummaryJob, so concurrent /summarize runs don't multiply the load on the AI
+ai_semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+
+PART_PROMPT = (
+    "You summarize Discord conversations. Summarize this part of the conversation in a few bullet points. "
+    "Keep names, decisions, open questions and important links; skip greetings and small talk."
+)
+MERGE_PROMPT = (
+    "You summarize Discord conversations. These are summaries of consecutive parts of one conversation, oldest first. "
+    "Merge them into one concise summary with bullet points grouped by topic, saying who said what where it matters."
+)
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def format_line(message):
+    if message.author.bot:
+        return None
+    text = message.clean_content.replace("\n", " ").strip()
+    if message.attachments:
+        text = f"{text} [attachment]".strip()
+    if not text:
+        return None
+    return f"{message.author.display_name}: {text[:MAX_LINE_CHARS]}"
+
+def group_by_tokens(texts, budget=CHUNK_TOKENS):
+    """Splits `texts` into consecutive groups of at most `budget` estimated tokens each."""
+    groups, current, size = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and size + tokens > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+class SummaryJob:
+    def __init__(self):
+        self.fetched = 0
+        self.parts = 0
+        self.done = 0
+        self.failed = 0
+
+    async def run(self, text, prompt, max_tokens):
+        """One AI call under the concurrency cap. None if it failed."""
+        self.parts += 1
+        async with ai_semaphore:
+            try:
+                result = await complete(text, system=prompt, max_tokens=max_tokens, temperature=0.3)
+            except Exception as e:
+                logger.warning(f"Summary call failed: {e}")
+                self.failed += 1
+                return None
+        self.done += 1
+        return result
+
+    async def reduce(self, summaries):
+        while len(summaries) > 1:
+            groups = group_by_tokens(summaries)
+            if len(groups) == 1:
+                return await self.run("\n\n".join(groups[0]), MERGE_PROMPT, FINAL_SUMMARY_TOKENS)
+            results = await asyncio.gather(*(self.run("\n\n".join(group), MERGE_PROMPT, PART_SUMMARY_TOKENS) for group in groups))
+            summaries = [r for r in results if r]
+        return summaries[0] if summaries else None
+
+async def report_progress(interaction, job):
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL)
+        try:
+            await interaction.edit_original_response(embed=create_embed(
+                "📝 Summarizing...",
+                f"Read **{job.fetched}** message(s), summarized **{job.done}/{job.parts}** part(s).",
+                discord.Color.blue()
+            ))
+        except discord.HTTPException:
+            pass
+
+async def summarize_history(channel, job, limit, after=None):
+    """Fetches the newest `limit` messages (after `after`) and returns (summary, message count, participant count)."""
+    tasks = []
+    chunk, size = [], 0
+    lines = 0
+    participants = set()
+
+    def flush():
+        # Lines arrive newest first; each chunk is put back in order
+        tasks.append(asyncio.create_task(job.run("\n".join(reversed(chunk)), PART_PROMPT, PART_SUMMARY_TOKENS)))
+
+    try:
+        async for message in channel.history(limit=limit, after=after, oldest_first=False):
+            job.fetched += 1
+            line = format_line(message)
+            if line is None:
+                continue
+            lines += 1
+            participants.add(message.author.id)
+            tokens = estimate_tokens(line)
+            if chunk and size + tokens > CHUNK_TOKENS:
+                flush()
+                chunk, size = [], 0
+            chunk.append(line)
+            size += tokens
+        if chunk:
+            flush()
+        partials = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    # Chunks were cut newest first too
+    summaries = [p for p in reversed(partials) if p]
+    return await job.reduce(summaries), lines, len(participants)
+
+@bot.tree.command(name="summarize", description="Summarize recent messages in this channel")
+@app_commands.describe(messages="How many recent messages to read (default 500)", hours="Only read messages from the last N hours")
+async def summarize(interaction: discord.Interaction, messages: app_commands.Range[int, 10, 5000] = 500, hours: app_commands.Range[int, 1, 168] = None):
+    channel = interaction.channel
+    if interaction.guild is None or not channel.permissions_for(interaction.guild.me).read_message_history:
+        return await interaction.response.send_message("I can't read the message history here.", ephemeral=True)
+    await interaction.response.defer(ephemeral=True)
+
+    start = time.monotonic()
+    after = discord.utils.utcnow() - datetime.timedelta(hours=hours) if hours else None
+    job = SummaryJob()
+    progress = asyncio.create_task(report_progress(interaction, job))
+    try:
+        summary, count, people = await summarize_history(channel, job, messages, after)
+    except discord.HTTPException as e:
+        logger.warning(f"Couldn't read history of {channel.id}: {e}")
+        return await interaction.edit_original_response(embed=create_embed("Summary Failed", "I couldn't read this channel's history.", discord.Color.red()))
+    finally:
+        progress.cancel()
+    elapsed = time.monotonic() - start
+    logger.info(f"Summarized {count} message(s) in {channel.id} with {job.done} AI call(s) in {elapsed:.1f}s")
+
+    if not count:
+        return await interaction.edit_original_response(embed=create_embed("📝 Summary", "There's nothing to summarize here yet.", discord.Color.light_grey()))
+    if summary is None:
+        return await interaction.edit_original_response(embed=create_embed("Summary Failed", "The AI couldn't summarize this right now. Please try again in a moment.", discord.Color.red()))
+
+    embed = create_embed(f"📝 Summary of #{channel.name}", summary[:4096], discord.Color.green())
+    footer = f"{count} message(s) from {people} member(s) • {elapsed:.1f}s"
+    if job.failed:
+        footer += f" • {job.failed} part(s) couldn't be summarized"
+    embed.set_footer(text=footer)
+    await interaction.edit_original_response(embed=embed)
@@ -0,0 +1,317 @@
+import os
+import re
+import json
+import logging
+import asyncio
+import discord
+from discord import app_commands
+from discord.ext import commands
+from core import bot, create_embed
+from interaction_guard import public_reply
+from command_sync import sync_commands
+from http_client import FetchError
+from cache import TTLCache
+from member_cache import all_members
+
+logger = logging.getLogger(__name__)
+
+class GuildStats:
+    """Counters for /serverinfo, kept up to date from gateway events instead of scanning the guild."""
+    __slots__ = ("bots", "text", "voice", "categories")
+
+    def __init__(self, guild, members):
+        # One full pass when the guild is first needed; O(1) updates afterwards
+        self.bots = sum(1 for m in members if m.bot)
+        self.text = self.voice = self.categories = 0
+        for channel in guild.channels:
+            self.count_channel(channel, 1)
+
+    def count_channel(self, channel, delta):
+        if isinstance(channel, discord.CategoryChannel):
+            self.categories += delta
+        elif isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+            self.voice += delta
+        elif isinstance(channel, (discord.TextChannel, discord.ForumChannel)):
+            self.text += delta
+
+guild_stats = {}
+# Rendered embeds (without the per-user footer), keyed by guild / (guild, member)
+serverinfo_cache = TTLCache(ttl=30, maxsize=1024)
+userinfo_cache = TTLCache(ttl=60, maxsize=4096)
+
+async def get_guild_stats(guild):
+    stats = guild_stats.get(guild.id)
+    if stats is None:
+        members = await all_members(guild)
+        stats = guild_stats.setdefault(guild.id, GuildStats(guild, members))
+    return stats
+
+@bot.listen("on_guild_available")
+async def stats_guild_available(guild):
+    # Fresh guild state after a reconnect: rebuild counters on next use
+    guild_stats.pop(guild.id, None)
+    serverinfo_cache.pop(guild.id)
+
+@bot.listen("on_guild_remove")
+async def stats_guild_remove(guild):
+    guild_stats.pop(guild.id, None)
+    serverinfo_cache.pop(guild.id)
+
+@bot.listen("on_member_join")
+async def stats_member_join(member):
+    stats = guild_stats.get(member.guild.id)
+    if stats and member.bot:
+        stats.bots += 1
+
+# The raw event fires for every member who leaves; on_member_remove only
+# does for cached ones, which with MEMBER_CACHE=lean is almost nobody
+@bot.listen("on_raw_member_remove")
+async def stats_member_remove(payload):
+    stats = guild_stats.get(payload.guild_id)
+    if stats and payload.user.bot:
+        stats.bots -= 1
+    userinfo_cache.pop((payload.guild_id, payload.user.id))
+
+# Same caveat, but there is no raw member update event: uncached members'
+# /userinfo embeds are only refreshed when the 60s TTL runs out
+@bot.listen("on_member_update")
+async def stats_member_update(before, after):
+    userinfo_cache.pop((after.guild.id, after.id))
+
+@bot.listen("on_guild_channel_create")
+async def stats_channel_create(channel):
+    stats = guild_stats.get(channel.guild.id)
+    if stats:
+        stats.count_channel(channel, 1)
+
+@bot.listen("on_guild_channel_delete")
+async def stats_channel_delete(channel):
+    stats = guild_stats.get(channel.guild.id)
+    if stats:
+        stats.count_channel(channel, -1)
+
+async def build_serverinfo(guild):
+    embed = discord.Embed(title=f"🏰 {guild.name}", description=guild.description or "No server description set.", color=discord.Color.blue())
+
+    # Members count
+    total_members = guild.member_count or 0
+    try:
+        stats = await get_guild_stats(guild)
+        bots = stats.bots
+        humans = total_members - bots
+    except discord.ClientException:
+        # Fallback if the member list can't be requested (requires intents.members)
+        stats = GuildStats(guild, [])
+        bots = "Unknown (Enable Intents)"
+        humans = "Unknown (Enable Intents)"
+
+    # Formatting bits
+    created_at = guild.created_at.strftime("%B %d, %Y")
+
+    embed.set_thumbnail(url=guild.icon.url if guild.icon else None)
+    embed.add_field(name="👑 Owner", value=f"<@{guild.owner_id}>", inline=True)
+    embed.add_field(name="🆔 ID", value=guild.id, inline=True)
+    embed.add_field(name="📅 Created On", value=created_at, inline=True)
+
+    embed.add_field(name="👥 Members", value=f"**Total:** {total_members}\n👤 **Humans:** {humans}\n🤖 **Bots:** {bots}", inline=True)
+    embed.add_field(name="✨ Features", value="\n".join([f"• {f.replace('_', ' ').title()}" for f in guild.features[:5]]) or "None", inline=True)
+    embed.add_field(name="📊 Stats", value=f"🎭 **Roles:** {len(guild.roles)}\n📁 **Categories:** {stats.categories}\n💬 **Text:** {stats.text}\n🔊 **Voice:** {stats.voice}", inline=True)
+
+    if guild.banner:
+        embed.set_image(url=guild.banner.url)
+    return embed.to_dict()
+
+@public_reply
+@bot.tree.command(name="serverinfo", description="Display detailed information about this server")
+async def serverinfo(interaction: discord.Interaction):
+    guild = interaction.guild
+    data = serverinfo_cache.get(guild.id)
+    if data is None:
+        if guild.id not in guild_stats and not guild.chunked:
+            # First member count on a large unchunked guild can take a few seconds
+            await interaction.response.defer()
+        data = await build_serverinfo(guild)
+        serverinfo_cache.set(guild.id, data)
+
+    embed = discord.Embed.from_dict(data)
+    embed.set_footer(text=f"Requested by {interaction.user.name}", icon_url=interaction.user.display_avatar.url)
+    if interaction.response.is_done():
+        await interaction.followup.send(embed=embed)
+    else:
+        await interaction.response.send_message(embed=embed)
+
+def build_userinfo(member):
+    roles = [role.mention for role in member.roles[1:]] # Exclude @everyone
+    roles.reverse()
+
+    embed = discord.Embed(title=f"👤 User Profile - {member.name}", color=member.color)
+    embed.set_thumbnail(url=member.display_avatar.url)
+
+    embed.add_field(name="📝 Name", value=f"**{member.name}**#{member.discriminator}", inline=True)
+    embed.add_field(name="🆔 ID", value=member.id, inline=True)
+    embed.add_field(name="🏷️ Nickname", value=member.nick or "None", inline=True)
+
+    embed.add_field(name="📅 Joined Discord", value=member.created_at.strftime("%B %d, %Y"), inline=True)
+    embed.add_field(name="📥 Joined Server", value=member.joined_at.strftime("%B %d, %Y") if member.joined_at else "Unknown", inline=True)
+    embed.add_field(name="⭐ Top Role", value=member.top_role.mention, inline=True)
+
+    embed.add_field(name=f"🎭 Roles ({len(roles)})", value=" ".join(roles[:10]) + ("..." if len(roles) > 10 else ""), inline=False)
+    return embed.to_dict()
+
+@public_reply
+@bot.tree.command(name="userinfo", description="Display detailed information about a member")
+async def userinfo(interaction: discord.Interaction, member: discord.Member = None):
+    member = member or interaction.user
+
+    key = (interaction.guild_id, member.id)
+    data = userinfo_cache.get(key)
+    if data is None:
+        data = build_userinfo(member)
+        userinfo_cache.set(key, data)
+
+    embed = discord.Embed.from_dict(data)
+    embed.set_footer(text=f"Requested by {interaction.user.name}", icon_url=interaction.user.display_avatar.url)
+    await interaction.response.send_message(embed=embed)
+
+@public_reply
+@bot.tree.command(name="avatar", description="View a member's avatar in full size")
+async def avatar(interaction: discord.Interaction, member: discord.Member = None):
+    member = member or interaction.user
+
+    embed = discord.Embed(title=f"🖼️ {member.name}'s Avatar", color=member.color or discord.Color.blue())
+    embed.set_image(url=member.display_avatar.url)
+
+    # Add links for different formats if possible
+    avatar_url = member.display_avatar.url
+    embed.description = f"[Download Avatar]({avatar_url})"
+
+    embed.set_footer(text=f"Requested by {interaction.user.name}", icon_url=interaction.user.display_avatar.url)
+    await interaction.response.send_message(embed=embed)
+
+# Discord's emoji upload limit
+EMOJI_MAX_BYTES = 256 * 1024
+EMOJI_PATTERN = re.compile(r"<(a?):(\w+):(\d+)>")
+
+def emoji_source(match):
+    """Returns (cache key, CDN URL, name) for a <a:name:id> / <:name:id> match."""
+    ext = "gif" if match.group(1) else "png"
+    emoji_id = match.group(3)
+    return f"emoji:{emoji_id}.{ext}", f"https://cdn.discordapp.com/emojis/{emoji_id}.{ext}", match.group(2)
+
+@public_reply
+@bot.tree.command(name="steal", description="Steal an emoji from another server")
+@app_commands.checks.has_permissions(manage_expressions=True)
+async def steal(interaction: discord.Interaction, emoji: str, name: str = None):
+    try:
+        await interaction.response.defer()
+
+        # Parse emoji URL
+        # Match standard discord emoji format <:name:id> or <a:name:id>
+        match = EMOJI_PATTERN.search(emoji)
+        if match:
+            key, url, emoji_name = emoji_source(match)
+            emoji_name = name or emoji_name
+        else:
+            # Try to treat as a direct URL
+            if emoji.startswith("http"):
+                key = url = emoji
+                emoji_name = name or "stolen_emoji"
+            else:
+                return await interaction.followup.send("Invalid emoji or URL provided.")
+
+        try:
+            image_data = await bot.http_client.get_asset(key, url, EMOJI_MAX_BYTES)
+        except FetchError as e:
+            return await interaction.followup.send(f"Failed to download emoji image: {e}")
+
+        new_emoji = await interaction.guild.create_custom_emoji(name=emoji_name, image=image_data)
+        await interaction.followup.send(f"Successfully stolen {new_emoji} as **{emoji_name}**!")
+
+    except Exception as e:
+        await interaction.followup.send(f"Error: {e}")
+
+@public_reply
+@bot.tree.command(name="stealmany", description="Steal several emojis at once")
+@app_commands.describe(emojis="Paste the emojis to steal (up to 25)")
+@app_commands.checks.has_permissions(manage_expressions=True)
+async def stealmany(interaction: discord.Interaction, emojis: str):
+    await interaction.response.defer()
+
+    # dict keeps the first occurrence of each emoji ID, in order
+    sources = {}
+    for match in EMOJI_PATTERN.finditer(emojis):
+        sources.setdefault(match.group(3), emoji_source(match))
+    sources = list(sources.values())[:25]
+    if not sources:
+        return await interaction.followup.send("No custom emojis found in your message.")
+
+    # Downloads run concurrently over the shared session; uploads stay sequential
+    # because emoji creation shares one rate limit bucket per guild anyway.
+    results = await asyncio.gather(
+        *(bot.http_client.get_asset(key, url, EMOJI_MAX_BYTES) for key, url, _ in sources),
+        return_exceptions=True
+    )
+
+    added = []
+    failed = []
+    for (_, _, emoji_name), image_data in zip(sources, results):
+        if isinstance(image_data, Exception):
+            failed.append(f"`{emoji_name}`: {image_data}")
+            continue
+        try:
+            new_emoji = await interaction.guild.create_custom_emoji(name=emoji_name, image=image_data)
+            added.append(str(new_emoji))
+        except discord.HTTPException as e:
+            failed.append(f"`{emoji_name}`: {e.text or e}")
+
+    description = f"**Added ({len(added)}):** {' '.join(added) or 'None'}"
+    if failed:
+        description += f"\n**Failed ({len(failed)}):**\n" + "\n".join(failed[:10])
+    color = discord.Color.green() if not failed else discord.Color.orange()
+    await interaction.followup.send(embed=create_embed("Emoji Steal", description, color))
+
+@bot.command(name="prefix")
+@commands.has_permissions(manage_guild=True)
+async def set_prefix(ctx, new_prefix: str):
+    """Changes the command prefix for this server. Requires Manage Server permission."""
+    try:
+        # Load existing prefixes
+        prefixes = {}
+        try:
+            if os.path.exists("prefixes.json"):
+                with open("prefixes.json", "r") as f:
+                    prefixes = json.load(f)
+        except:
+            pass
+
+        # Set the NEW prefix (replaces the old one)
+        prefixes[str(ctx.guild.id)] = new_prefix
+
+        # Save back to file
+        with open("prefixes.json", "w") as f:
+            json.dump(prefixes, f)
+
+        # Update the bot's current prefix mapping if it's already running
+        # (Though the get_prefix function will handle it on next command)
+
+        embed = discord.Embed(
+            title="✅ Prefix Updated",
+            description=f"The command prefix for this server has been changed to: `{new_prefix}`",
+            color=discord.Color.green()
+        )
+        embed.set_footer(text="Powered by Aditya Official NGT Team")
+        await ctx.send(embed=embed)
+
+    except Exception as e:
+        await ctx.send(f"❌ Error: {e}")
+
+@bot.command(name="sync")
+@commands.is_owner()
+async def sync_cmd(ctx, scope: str = "guild"):
+    """Forces a slash command sync. `guild` syncs to this server instantly, `global` everywhere. Bot owner only."""
+    guild_ids = [ctx.guild.id] if scope == "guild" and ctx.guild else []
+    synced = await sync_commands(bot, guild_ids=guild_ids, force=True)
+    if synced:
+        await ctx.send(f"✅ Synced slash commands: {', '.join(synced)}")
+    else:
+        await ctx.send("❌ Sync failed, check the logs.")
@@ -0,0 +1,185 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import aiohttp
+
+# One pooled aiohttp session for every outbound fetch the bot makes (emoji
+# steal, CDN images, ...), plus a two-level asset cache: a byte-bounded LRU in
+# memory and a size-bounded directory on disk. Downloads are streamed and
+# aborted as soon as they exceed the caller's size cap.
+
+logger = logging.getLogger(__name__)
+
+ASSET_CACHE_DIR = "asset_cache"
+MEMORY_CACHE_BYTES = 16 * 1024 * 1024
+DISK_CACHE_BYTES = 128 * 1024 * 1024
+IMAGE_TYPES = ("image/png", "image/gif", "image/jpeg", "image/webp")
+
+class FetchError(Exception):
+    """Raised when a download fails, is too large or has the wrong content type."""
+
+class AssetCache:
+    def __init__(self, directory=ASSET_CACHE_DIR, memory_bytes=MEMORY_CACHE_BYTES, disk_bytes=DISK_CACHE_BYTES):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk_size = None # computed lazily on first write
+        self._disk_lock = threading.Lock() # writes run in asyncio.to_thread workers
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get_memory(self, key):
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+        return data
+
+    def put_memory(self, key, data):
+        if len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path) # mtime doubles as LRU timestamp
+            return data
+        except FileNotFoundError:
+            return None
+
+    def write_disk(self, key, data):
+        with self._disk_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if self._disk_size is None:
+                self._disk_size = sum(e.stat().st_size for e in os.scandir(self.directory) if e.is_file())
+            path = self._path(key)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+            self._disk_size += len(data) - replaced
+            if self._disk_size > self.disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        entries = sorted(
+            (e for e in os.scandir(self.directory) if e.is_file()),
+            key=lambda e: e.stat().st_mtime
+        )
+        total = sum(e.stat().st_size for e in entries)
+        # Trim to 90% so we don't evict again on the very next write
+        for entry in entries:
+            if total <= self.disk_bytes * 0.9:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self._disk_size = total
+
+class HTTPClient:
+    """Shared HTTP client owned by the bot (`bot.http_client`). The session is created on first use."""
+    def __init__(self, cache=None):
+        self.cache = cache or AssetCache()
+        self._session = None
+        self._pending = {}
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=20, connect=5)
+            )
+        return self._session
+
+    async def fetch(self, url, max_bytes, allowed_types=None):
+        """Downloads `url` in chunks, failing early if it is bigger than `max_bytes`."""
+        try:
+            async with self.session.get(url) as resp:
+                if resp.status != 200:
+                    raise FetchError(f"HTTP {resp.status}")
+                content_type = resp.content_type
+                if allowed_types and content_type not in allowed_types:
+                    raise FetchError(f"Unsupported content type `{content_type}`")
+                if resp.content_length and resp.content_length > max_bytes:
+                    raise FetchError(f"File is too large ({resp.content_length // 1024} KB, max {max_bytes // 1024} KB)")
+
+                chunks = []
+                size = 0
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise FetchError(f"File is too large (max {max_bytes // 1024} KB)")
+                    chunks.append(chunk)
+                return b"".join(chunks)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise FetchError(f"Download failed: {e}") from e
+
+    async def get_asset(self, key, url, max_bytes, allowed_types=IMAGE_TYPES):
+        """Returns the bytes for `key`, from memory, disk or (once per key at a time) the network."""
+        data = self.cache.get_memory(key)
+        if data is not None:
+            self.cache.hits += 1
+            return data
+
+        # Several callers asking for the same asset share one download
+        pending = self._pending.get(key)
+        if pending:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            data = await asyncio.to_thread(self.cache.read_disk, key)
+            if data is not None and len(data) <= max_bytes:
+                self.cache.disk_hits += 1
+            else:
+                self.cache.misses += 1
+                start = time.perf_counter()
+                data = await self.fetch(url, max_bytes, allowed_types)
+                logger.debug(f"Fetched {url} ({len(data)} bytes) in {time.perf_counter() - start:.2f}s")
+                await asyncio.to_thread(self.cache.write_disk, key, data)
+            self.cache.put_memory(key, data)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiters-less failures don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                # The owner was cancelled (CancelledError skips the handler above); don't leave waiters hanging
+                future.set_exception(FetchError("Download was cancelled"))
+                future.exception()
+            self._pending.pop(key, None)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,178 @@
+import os
+import asyncio
+import logging
+import discord
+from discord import app_commands
+from log_setup import log_context
+
+# Auto-defer guard for slash commands. Discord fails an interaction that isn't
+# acknowledged within 3 seconds of being created, so every application command
+# gets a watchdog that defers it once AUTO_DEFER_BUDGET seconds have passed
+# since the interaction was created (not since we received it) and the command
+# hasn't responded yet. Commands don't need to know: after an automatic defer,
+# `interaction.response.send_message` is sent as the followup and `defer` is a
+# no-op. A deferred response can't change visibility afterwards, so the
+# automatic defer is ephemeral unless the command is marked @public_reply
+# (its normal reply is visible to the channel). Time to first response is recorded per command as a histogram,
+# along with how many commands needed the automatic defer; both are served on
+# /health.
+
+logger = logging.getLogger(__name__)
+
+AUTO_DEFER_BUDGET = float(os.environ.get("AUTO_DEFER_BUDGET", "2.2"))
+SLOW_COMMAND_SECONDS = 10
+BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 10) # upper bounds in seconds; the last bucket is everything above
+
+class CommandLatency:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.auto_deferred = 0
+        self.expired = 0
+        self.errors = 0
+
+    def add(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self):
+        labels = [f"<={b}s" for b in BUCKETS] + [f">{BUCKETS[-1]}s"]
+        return {
+            "calls": self.calls,
+            "avg_ack_ms": round(self.total / self.calls * 1000, 1) if self.calls else 0,
+            "max_ack_ms": round(self.max * 1000, 1),
+            "ack_histogram": dict(zip(labels, self.counts)),
+            "near_timeouts": self.auto_deferred,
+            "expired": self.expired,
+            "errors": self.errors,
+        }
+
+def public_reply(command):
+    """Marks a slash command whose reply is public, so an automatic defer is public too."""
+    command.extras["ephemeral"] = False
+    return command
+
+def replies_ephemeral(interaction):
+    command = interaction.command
+    return command is None or command.extras.get("ephemeral", True)
+
+def elapsed_since(interaction):
+    # created_at comes from the interaction's snowflake, i.e. Discord's clock
+    return max(0.0, (discord.utils.utcnow() - interaction.created_at).total_seconds())
+
+class GuardedResponse(discord.InteractionResponse):
+    """InteractionResponse that serializes responses with the watchdog and redirects them after an automatic defer."""
+
+    def __init__(self, parent, stats):
+        super().__init__(parent)
+        self._stats = stats
+        self._lock = asyncio.Lock()
+        self._acked = False
+        self.auto_deferred = False
+
+    def _record_ack(self):
+        if not self._acked:
+            self._acked = True
+            self._stats.add(elapsed_since(self._parent))
+
+    async def defer(self, **kwargs):
+        async with self._lock:
+            if self.auto_deferred:
+                return None
+            result = await super().defer(**kwargs)
+            self._record_ack()
+            return result
+
+    async def send_message(self, *args, delete_after=None, **kwargs):
+        async with self._lock:
+            if not self.auto_deferred:
+                result = await super().send_message(*args, delete_after=delete_after, **kwargs)
+                self._record_ack()
+                return result
+        # The first followup replaces the "thinking" message left by the automatic defer
+        message = await self._parent.followup.send(*args, wait=True, **kwargs)
+        if delete_after is not None:
+            await message.delete(delay=delete_after)
+        return message
+
+    async def send_modal(self, modal):
+        async with self._lock:
+            result = await super().send_modal(modal)
+            self._record_ack()
+            return result
+
+    async def auto_defer(self):
+        if self._lock.locked():
+            return # the command is responding right now
+        async with self._lock:
+            if self.is_done():
+                return
+            try:
+                await super().defer(thinking=True, ephemeral=replies_ephemeral(self._parent))
+            except discord.NotFound:
+                # Unknown interaction: the 3 seconds were already up
+                self._stats.expired += 1
+                return
+            self.auto_deferred = True
+            self._stats.auto_deferred += 1
+            self._record_ack()
+
+class GuardedTree(app_commands.CommandTree):
+    """CommandTree that runs every application command under the auto-defer watchdog."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = {} # qualified command name -> CommandLatency
+
+    async def _call(self, interaction):
+        if interaction.type is not discord.InteractionType.application_command:
+            return await super()._call(interaction)
+
+        name = self._command_name(interaction)
+        stats = self.latency.get(name)
+        if stats is None:
+            stats = self.latency[name] = CommandLatency()
+        response = GuardedResponse(interaction, stats)
+        interaction._cs_response = response
+
+        with log_context(guild_id=interaction.guild_id, channel_id=interaction.channel_id, user_id=interaction.user.id, command=name):
+            watchdog = asyncio.create_task(self._watchdog(response, AUTO_DEFER_BUDGET - elapsed_since(interaction)))
+            start = discord.utils.utcnow()
+            try:
+                await super()._call(interaction)
+            finally:
+                watchdog.cancel()
+                if interaction.command_failed:
+                    stats.errors += 1
+                seconds = (discord.utils.utcnow() - start).total_seconds()
+                if seconds > SLOW_COMMAND_SECONDS:
+                    logger.warning(f"/{name} took {seconds:.1f}s")
+
+    @staticmethod
+    def _command_name(interaction):
+        data = interaction.data or {}
+        parts = [data.get("name", "unknown")]
+        options = data.get("options") or []
+        # Subcommand groups and subcommands are nested as the first option
+        while options and options[0].get("type") in (1, 2):
+            parts.append(options[0]["name"])
+            options = options[0].get("options") or []
+        return " ".join(parts)
+
+    async def _watchdog(self, response, delay):
+        await asyncio.sleep(max(0.0, delay))
+        try:
+            await response.auto_defer()
+        except discord.HTTPException as e:
+            logger.warning(f"Auto-defer failed: {e}")
+
+    def latency_as_dict(self):
+        return {name: stats.as_dict() for name, stats in sorted(self.latency.items())}
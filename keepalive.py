@@ -0,0 +1,81 @@
+import math
+import logging
+from aiohttp import web
+from discord.ext import commands
+from startup import timer
+from message_pipeline import pipeline
+
+# Keep-alive / health server. Runs on the bot's own event loop (aiohttp is
+# already a discord.py dependency), so there is no extra thread or WSGI worker.
+
+logger = logging.getLogger(__name__)
+
+def latency_ms(latency):
+    # discord.py reports nan/inf until the first heartbeat ack
+    return round(latency * 1000) if math.isfinite(latency) else None
+
+async def home(request):
+    return web.Response(text="I'm alive!")
+
+async def health(request):
+    # Per-shard status so the supervisor / uptime checks can tell which shard is down
+    bot = request.app["bot"]
+    shards = []
+    if isinstance(bot, commands.AutoShardedBot):
+        for shard_id, shard in sorted(bot.shards.items()):
+            shards.append({
+                "id": shard_id,
+                "latency_ms": latency_ms(shard.latency),
+                "closed": shard.is_closed(),
+                "ratelimited": shard.is_ws_ratelimited(),
+            })
+    else:
+        shards.append({
+            "id": 0,
+            "latency_ms": latency_ms(bot.latency),
+            "closed": bot.is_closed(),
+            "ratelimited": bot.is_ws_ratelimited(),
+        })
+
+    guild_counts = {}
+    for guild in bot.guilds:
+        guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+    for shard in shards:
+        shard["guilds"] = guild_counts.get(shard["id"], 0)
+
+    healthy = bot.is_ready() and not any(s["closed"] for s in shards)
+    body = {
+        "status": "ok" if healthy else "starting",
+        "shard_count": bot.shard_count or 1,
+        "shards": shards,
+        "startup_ms": timer.as_dict(),
+        "message_stages": pipeline.as_dict(),
+        "commands": bot.tree.latency_as_dict(),
+        "rest": bot.rest.as_dict(),
+    }
+    search = getattr(bot, "track_search", None)
+    if search is not None:
+        body["search_sources"] = search.as_dict()
+    log_handler = getattr(bot, "log_handler", None)
+    if log_handler is not None:
+        body["log_dropped"] = log_handler.dropped
+    ai_cache = getattr(bot, "ai_cache", None)
+    if ai_cache is not None:
+        body["ai_cache"] = ai_cache.as_dict()
+    return web.json_response(body, status=200 if healthy else 503)
+
+def create_app(bot):
+    app = web.Application()
+    app["bot"] = bot
+    app.router.add_get("/", home)
+    app.router.add_get("/health", health)
+    return app
+
+async def start_keepalive(bot, port):
+    """Starts the health server on the running loop and returns its runner (call `cleanup()` to stop)."""
+    runner = web.AppRunner(create_app(bot), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "0.0.0.0", port)
+    await site.start()
+    logger.info(f"Keep-alive server listening on port {port}")
+    return runner
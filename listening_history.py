@@ -0,0 +1,142 @@
+import time
+from sqlite_store import SQLiteStore
+
+# Listening history (SQLite, WAL mode). Every finished track is appended to
+# `plays` and, in the same batch transaction, added to rollup tables (per
+# track, per requester, per guild). /stats only reads the rollups, so it stays
+# fast however long the raw history gets. Rollups are also kept under guild 0
+# for bot-wide numbers.
+
+HISTORY_DB = "history.db"
+GLOBAL = 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    guild_id INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    requester_id INTEGER,
+    ms_played INTEGER NOT NULL,
+    skipped INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_plays_guild_ts ON plays (guild_id, ts);
+CREATE TABLE IF NOT EXISTS track_totals (
+    guild_id INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    title TEXT,
+    author TEXT,
+    uri TEXT,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    ms_played INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (guild_id, track_id)
+);
+CREATE INDEX IF NOT EXISTS idx_track_totals_plays ON track_totals (guild_id, plays);
+CREATE TABLE IF NOT EXISTS requester_totals (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    plays INTEGER NOT NULL,
+    ms_played INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_requester_totals_plays ON requester_totals (guild_id, plays);
+CREATE TABLE IF NOT EXISTS guild_totals (
+    guild_id INTEGER PRIMARY KEY,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    ms_played INTEGER NOT NULL
+);
+"""
+
+class ListeningHistory(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=HISTORY_DB, batch_size=200, flush_interval=5.0):
+        super().__init__(path, batch_size, flush_interval)
+
+    def record(self, guild_id, track, requester_id, ms_played, skipped):
+        """Queues one play. Never blocks."""
+        self._enqueue((
+            time.time(), guild_id, track.identifier, track.title, track.author, track.uri,
+            requester_id, int(ms_played), int(skipped)
+        ))
+
+    def _write_batch(self, conn, batch):
+        conn.executemany(
+            "INSERT INTO plays (ts, guild_id, track_id, requester_id, ms_played, skipped) VALUES (?, ?, ?, ?, ?, ?)",
+            [(ts, guild_id, track_id, requester_id, ms, skipped) for ts, guild_id, track_id, _, _, _, requester_id, ms, skipped in batch]
+        )
+
+        # Sum the batch in memory first so each rollup row is upserted once
+        tracks, requesters, guilds = {}, {}, {}
+        for ts, guild_id, track_id, title, author, uri, requester_id, ms, skipped in batch:
+            for gid in (guild_id, GLOBAL):
+                t = tracks.setdefault((gid, track_id), [title, author, uri, 0, 0, 0, ts])
+                t[3] += 1
+                t[4] += skipped
+                t[5] += ms
+                t[6] = max(t[6], ts)
+                if requester_id is not None:
+                    r = requesters.setdefault((gid, requester_id), [0, 0])
+                    r[0] += 1
+                    r[1] += ms
+                g = guilds.setdefault(gid, [0, 0, 0])
+                g[0] += 1
+                g[1] += skipped
+                g[2] += ms
+
+        conn.executemany(
+            """INSERT INTO track_totals (guild_id, track_id, title, author, uri, plays, skips, ms_played, last_ts)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (guild_id, track_id) DO UPDATE SET
+                   title = excluded.title, author = excluded.author, uri = excluded.uri,
+                   plays = plays + excluded.plays, skips = skips + excluded.skips,
+                   ms_played = ms_played + excluded.ms_played, last_ts = excluded.last_ts""",
+            [(gid, track_id, *values) for (gid, track_id), values in tracks.items()]
+        )
+        conn.executemany(
+            """INSERT INTO requester_totals (guild_id, user_id, plays, ms_played) VALUES (?, ?, ?, ?)
+               ON CONFLICT (guild_id, user_id) DO UPDATE SET
+                   plays = plays + excluded.plays, ms_played = ms_played + excluded.ms_played""",
+            [(gid, user_id, *values) for (gid, user_id), values in requesters.items()]
+        )
+        conn.executemany(
+            """INSERT INTO guild_totals (guild_id, plays, skips, ms_played) VALUES (?, ?, ?, ?)
+               ON CONFLICT (guild_id) DO UPDATE SET
+                   plays = plays + excluded.plays, skips = skips + excluded.skips, ms_played = ms_played + excluded.ms_played""",
+            [(gid, *values) for gid, values in guilds.items()]
+        )
+
+    async def top_tracks(self, guild_id=GLOBAL, limit=10):
+        return await self._read(
+            "SELECT * FROM track_totals WHERE guild_id = ? ORDER BY plays DESC LIMIT ?", (guild_id, limit)
+        )
+
+    async def top_requesters(self, guild_id=GLOBAL, limit=5):
+        return await self._read(
+            "SELECT * FROM requester_totals WHERE guild_id = ? ORDER BY plays DESC LIMIT ?", (guild_id, limit)
+        )
+
+    async def top_guilds(self, limit=10):
+        """Guilds by listening time (the most Lavalink time)."""
+        return await self._read(
+            "SELECT * FROM guild_totals WHERE guild_id != 0 ORDER BY ms_played DESC LIMIT ?", (limit,)
+        )
+
+    async def totals(self, guild_id=GLOBAL):
+        return await self._read("SELECT * FROM guild_totals WHERE guild_id = ?", (guild_id,), one=True)
+
+    async def sequences(self, limit=200_000):
+        """(guild_id, track_id) of the last `limit` non-skipped plays, ordered by guild then time (for autoplay)."""
+        return await self._read(
+            """SELECT guild_id, track_id FROM (
+                   SELECT id, guild_id, track_id FROM plays WHERE skipped = 0 ORDER BY id DESC LIMIT ?
+               ) ORDER BY guild_id, id""",
+            (limit,)
+        )
+
+    async def track_uri(self, track_id):
+        row = await self._read("SELECT uri FROM track_totals WHERE guild_id = 0 AND track_id = ?", (track_id,), one=True)
+        return row["uri"] if row else None
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import contextlib
+import contextvars
+import logging.handlers
+
+# Logging setup shared by main.py and supervisor.py. Records never touch
+# stdout on the event loop: a QueueHandler hands them to a background thread
+# (QueueListener) that formats and writes them, and when the queue is full
+# records are dropped and counted rather than blocking. Each line is a JSON
+# object; guild/user/channel/command fields come from `log_context(...)`,
+# which the command tree and the message pipeline set for everything logged
+# while they run. Stdlib-only, so it can be set up before discord is imported.
+#
+#   LOG_LEVEL      root level (default INFO)
+#   LOG_LEVELS     per-subsystem levels, e.g. "discord=WARNING,features.moderation=DEBUG"
+#   LOG_FORMAT     "json" (default) or "text"
+#   LOG_BURST      records per call site per LOG_SAMPLE_WINDOW seconds before sampling kicks in (default 20)
+#   LOG_SAMPLE     past the burst, 1 in N records from that call site is kept (default 100)
+
+LOG_QUEUE_SIZE = 10000
+LOG_SAMPLE_WINDOW = 10.0
+CONTEXT_FIELDS = ("guild_id", "channel_id", "user_id", "command")
+
+_context = contextvars.ContextVar("log_context", default={})
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Adds `fields` (guild_id, user_id, command, ...) to every record logged inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+def parse_levels(value):
+    """Parses "discord=WARNING,features.music=DEBUG" into {logger name: level}."""
+    levels = {}
+    for part in value.split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+class ContextFilter(logging.Filter):
+    # Runs on the thread that logged the record, where the context is set
+    def filter(self, record):
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Lets `burst` records per call site through every `window` seconds, then 1 in `rate`. Errors always pass."""
+
+    def __init__(self, burst=20, rate=100, window=LOG_SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.rate = rate
+        self.window = window
+        self.sites = {} # (pathname, lineno) -> [window start, count, suppressed]
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        site = self.sites.get(key)
+        if site is None or now - site[0] >= self.window:
+            # A new window; records suppressed in the last one are reported on the next record through
+            site = self.sites[key] = [now, 0, site[2] if site else 0]
+        site[1] += 1
+        if site[1] <= self.burst or site[1] % self.rate == 0:
+            if site[2]:
+                record.suppressed = site[2]
+                site[2] = 0
+            return True
+        site[2] += 1
+        return False
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args and render the traceback here (the original objects may
+        # change before the listener thread gets to them); the rest of the
+        # formatting happens in that thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JSONFormatter(logging.Formatter):
+    converter = time.gmtime
+
+    def __init__(self, process=None):
+        super().__init__()
+        self.process = process
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if self.process:
+            entry["process"] = self.process
+        for key in CONTEXT_FIELDS + ("suppressed",):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, prefix=""):
+        super().__init__(f"%(asctime)s - %(levelname)s - {prefix}%(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = " ".join(f"{key}={getattr(record, key)}" for key in CONTEXT_FIELDS if getattr(record, key, None) is not None)
+        return f"{line} [{fields}]" if fields else line
+
+def setup_logging(name=None):
+    """Routes all logging through a background writer thread. `name` tags every line (e.g. "supervisor").
+
+    Returns the queue handler; its `dropped` counts records lost to a full queue.
+    """
+    stream = logging.StreamHandler(sys.stdout)
+    if os.environ.get("LOG_FORMAT", "json") == "text":
+        stream.setFormatter(TextFormatter(f"[{name}] " if name else ""))
+    else:
+        stream.setFormatter(JSONFormatter(name))
+
+    handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(int(os.environ.get("LOG_BURST", "20")), int(os.environ.get("LOG_SAMPLE", "100"))))
+    handler.addFilter(ContextFilter())
+    listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    for logger_name, level in parse_levels(os.environ.get("LOG_LEVELS", "")).items():
+        logging.getLogger(logger_name).setLevel(level)
+    return handler
@@ -0,0 +1,105 @@
+import time
+import logging
+from collections import OrderedDict
+import discord
+
+# Member cache policy. "full" (default) is discord.py's normal behaviour:
+# every member of every guild is chunked at startup and kept in memory.
+# "lean" only keeps members that are in voice (needed for music), plus a
+# bounded LRU of members we recently saw send a message or use a command.
+# Anything else is fetched on demand with resolve_member().
+#
+# discord.py only dispatches member update events for cached members, so the
+# LRU never hears about nick or role changes: entries expire after
+# RECENT_MEMBERS_TTL seconds and are fetched again. Departures are taken from
+# the raw remove event, which fires for everyone.
+#
+#   MEMBER_CACHE        "full" or "lean"
+#   RECENT_MEMBERS_MAX  size of the recently-active LRU in lean mode
+#   RECENT_MEMBERS_TTL  seconds a recently-active member is trusted (default 300)
+
+logger = logging.getLogger(__name__)
+
+def member_cache_options(policy):
+    """Returns the extra commands.Bot kwargs for the given member cache policy."""
+    if policy == "lean":
+        return {
+            "member_cache_flags": discord.MemberCacheFlags(voice=True, joined=False),
+            "chunk_guilds_at_startup": False,
+        }
+    return {}
+
+class RecentMembers:
+    """Bounded LRU of recently active members, keyed by (guild_id, user_id). Entries expire `ttl` seconds after they were last seen."""
+    def __init__(self, maxsize, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._members = OrderedDict()
+
+    def touch(self, member):
+        key = (member.guild.id, member.id)
+        self._members[key] = (time.monotonic() + self.ttl, member)
+        self._members.move_to_end(key)
+        if len(self._members) > self.maxsize:
+            self._members.popitem(last=False)
+
+    def get(self, guild_id, user_id):
+        key = (guild_id, user_id)
+        entry = self._members.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._members[key]
+            return None
+        self._members.move_to_end(key)
+        return entry[1]
+
+    def discard(self, guild_id, user_id):
+        self._members.pop((guild_id, user_id), None)
+
+    def __len__(self):
+        return len(self._members)
+
+def install(bot, maxsize, ttl=300):
+    """Attaches a RecentMembers LRU to `bot.recent_members` and keeps it fed from gateway events."""
+    recent = bot.recent_members = RecentMembers(maxsize, ttl)
+
+    @bot.listen("on_message")
+    async def recent_from_message(message):
+        if isinstance(message.author, discord.Member):
+            recent.touch(message.author)
+
+    @bot.listen("on_interaction")
+    async def recent_from_interaction(interaction):
+        if isinstance(interaction.user, discord.Member):
+            recent.touch(interaction.user)
+
+    @bot.listen("on_raw_member_remove")
+    async def recent_from_remove(payload):
+        recent.discard(payload.guild_id, payload.user.id)
+
+    return recent
+
+async def all_members(guild):
+    """The full member list. With the lean cache the guild isn't chunked, so it is requested without being cached."""
+    if guild.chunked:
+        return guild.members
+    return await guild.chunk(cache=False)
+
+async def resolve_member(bot, guild, user_id):
+    """Cache first (guild cache, then recently active), falling back to a REST fetch. None if not a member."""
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    recent = getattr(bot, "recent_members", None)
+    if recent is not None:
+        member = recent.get(guild.id, user_id)
+        if member is not None:
+            return member
+    try:
+        member = await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
+    if recent is not None:
+        recent.touch(member)
+    return member
@@ -0,0 +1,78 @@
+import time
+import logging
+from log_setup import log_context
+
+# Staged message handling. The single on_message hands every message to
+# `pipeline.dispatch`, which runs the registered stages in order
+# (normalize -> moderation -> commands -> intents). A stage returns True when
+# it has fully handled the message, which skips every later stage, so cheap
+# early exits (bots, automod deletions, prefix commands) never reach the AI or
+# music handlers. Each stage is timed separately; the numbers are served on
+# /health.
+
+logger = logging.getLogger(__name__)
+
+SLOW_STAGE_SECONDS = 5
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.handled = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, handled):
+        self.calls += 1
+        self.handled += handled
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "handled": self.handled,
+            "errors": self.errors,
+            "avg_ms": round(self.total / self.calls * 1000, 2) if self.calls else 0,
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+class MessagePipeline:
+    def __init__(self):
+        self.stages = [] # (order, name, handler, stats)
+
+    def stage(self, name, order):
+        """Registers `async handler(message, ctx) -> bool` to run at position `order`."""
+        def decorator(handler):
+            self.stages.append((order, name, handler, StageStats()))
+            self.stages.sort(key=lambda s: s[0])
+            return handler
+        return decorator
+
+    async def dispatch(self, message, ctx):
+        guild_id = message.guild.id if message.guild else None
+        with log_context(guild_id=guild_id, channel_id=message.channel.id, user_id=message.author.id):
+            return await self._run(message, ctx)
+
+    async def _run(self, message, ctx):
+        for _, name, handler, stats in self.stages:
+            start = time.perf_counter()
+            try:
+                handled = await handler(message, ctx)
+            except Exception:
+                stats.errors += 1
+                logger.exception(f"Message stage {name} failed")
+                handled = False
+            seconds = time.perf_counter() - start
+            stats.add(seconds, bool(handled))
+            if seconds > SLOW_STAGE_SECONDS:
+                logger.warning(f"Message stage {name} took {seconds:.1f}s")
+            if handled:
+                return name
+        return None
+
+    def as_dict(self):
+        return {name: stats.as_dict() for _, name, _, stats in self.stages}
+
+pipeline = MessagePipeline()
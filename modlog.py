@@ -0,0 +1,74 @@
+import time
+import json
+from sqlite_store import SQLiteStore
+
+# Append-only moderation event store (SQLite, WAL mode). Handlers call
+# `bot.modlog.log(...)`, which only appends to an in-memory buffer that
+# SQLiteStore writes in batches. Queries use keyset pagination over the
+# (guild, ts) indexes, so paging stays fast however many rows there are.
+
+MODLOG_DB = "modlog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    guild_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    user_id INTEGER,
+    moderator_id INTEGER,
+    reason TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_guild_ts ON events (guild_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_guild_user_ts ON events (guild_id, user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_guild_action_ts ON events (guild_id, action, ts);
+"""
+
+class ModLog(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=MODLOG_DB, batch_size=500, flush_interval=1.0):
+        super().__init__(path, batch_size, flush_interval)
+
+    def log(self, guild_id, action, user_id=None, moderator_id=None, reason=None, **details):
+        """Queues one event. Never blocks; safe to call from any handler on the event loop."""
+        self._enqueue((
+            time.time(), guild_id, action, user_id, moderator_id, reason,
+            json.dumps(details) if details else None
+        ))
+
+    def _write_batch(self, conn, batch):
+        conn.executemany(
+            "INSERT INTO events (ts, guild_id, action, user_id, moderator_id, reason, details) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+
+    def _where(self, guild_id, user_id, action, since):
+        clauses = ["guild_id = ?"]
+        params = [guild_id]
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        return clauses, params
+
+    async def query(self, guild_id, user_id=None, action=None, since=None, before=None, limit=10):
+        """Newest-first page of events. Pass the last row's (ts, id) as `before` to get the next page."""
+        clauses, params = self._where(guild_id, user_id, action, since)
+        if before is not None:
+            clauses.append("(ts, id) < (?, ?)")
+            params.extend(before)
+        sql = f"SELECT * FROM events WHERE {' AND '.join(clauses)} ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return await self._read(sql, params)
+
+    async def count(self, guild_id, user_id=None, action=None, since=None):
+        clauses, params = self._where(guild_id, user_id, action, since)
+        sql = f"SELECT COUNT(*) FROM events WHERE {' AND '.join(clauses)}"
+        return (await self._read(sql, params, one=True))[0]
@@ -0,0 +1,83 @@
+import json
+import asyncio
+from sqlite_store import SQLiteStore
+
+# Poll persistence (SQLite, WAL mode). Votes are counted in memory by
+# features/polls.py; every change is only queued here and written in
+# batches, with a batch collapsed to each voter's final choice first, so a
+# burst of thousands of votes costs a couple of statements. Open polls and
+# their votes are loaded back on startup.
+
+POLLS_DB = "polls.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS polls (
+    poll_id INTEGER PRIMARY KEY,
+    guild_id INTEGER,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER,
+    author_id INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    ends_at REAL,
+    closed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS votes (
+    poll_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    option INTEGER NOT NULL,
+    PRIMARY KEY (poll_id, user_id)
+);
+"""
+
+class PollStore(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=POLLS_DB, batch_size=1000, flush_interval=5.0):
+        super().__init__(path, batch_size, flush_interval)
+
+    def create(self, poll):
+        self._enqueue(("poll", (
+            poll.poll_id, poll.guild_id, poll.channel_id, poll.message_id, poll.author_id,
+            poll.question, json.dumps(poll.options), poll.ends_at
+        )))
+
+    def vote(self, poll_id, user_id, option):
+        """Queues a voter's current choice; None removes their vote."""
+        self._enqueue(("vote", (poll_id, user_id, option)))
+
+    def close_poll(self, poll_id):
+        self._enqueue(("close", poll_id))
+
+    def _write_batch(self, conn, batch):
+        polls, closes = [], []
+        votes = {}
+        for kind, data in batch:
+            if kind == "poll":
+                polls.append(data)
+            elif kind == "vote":
+                votes[data[:2]] = data[2]
+            else:
+                closes.append((data,))
+
+        conn.executemany("INSERT OR REPLACE INTO polls (poll_id, guild_id, channel_id, message_id, author_id, question, options, ends_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", polls)
+        conn.executemany(
+            "INSERT OR REPLACE INTO votes (poll_id, user_id, option) VALUES (?, ?, ?)",
+            [(poll_id, user_id, option) for (poll_id, user_id), option in votes.items() if option is not None]
+        )
+        conn.executemany(
+            "DELETE FROM votes WHERE poll_id = ? AND user_id = ?",
+            [key for key, option in votes.items() if option is None]
+        )
+        conn.executemany("UPDATE polls SET closed = 1 WHERE poll_id = ?", closes)
+
+    async def load_open(self):
+        """Open polls as (poll row, [(user_id, option), ...]) pairs."""
+        def load(conn):
+            polls = conn.execute("SELECT * FROM polls WHERE closed = 0").fetchall()
+            result = []
+            for poll in polls:
+                votes = conn.execute("SELECT user_id, option FROM votes WHERE poll_id = ?", (poll["poll_id"],)).fetchall()
+                result.append((poll, [tuple(v) for v in votes]))
+            return result
+        return await asyncio.to_thread(self._execute, load)
@@ -0,0 +1,82 @@
+from array import array
+
+# Track-to-track co-occurrence index for autoplay. Whenever a guild finishes
+# track B right after track A, the A -> B count goes up by one. Each track
+# (mapped to a small int) has two parallel arrays: neighbour ids and counts,
+# capped at MAX_NEIGHBOURS by replacing the weakest link. Recommending scores
+# the neighbours of the last few tracks (as transition probabilities, the
+# most recent track weighted highest), so a lookup touches a few hundred
+# array slots and needs no network call.
+
+MAX_NEIGHBOURS = 64
+RECENT_WEIGHTS = (1.0, 0.5, 0.25)
+
+class CooccurrenceIndex:
+    def __init__(self):
+        self.ids = [] # int -> track id
+        self.lookup = {} # track id -> int
+        self.neighbours = [] # int -> array('I') of neighbour ints
+        self.counts = [] # int -> array('I') of counts, parallel to neighbours
+        self.totals = array("I")
+
+    def _id(self, track_id):
+        i = self.lookup.get(track_id)
+        if i is None:
+            i = self.lookup[track_id] = len(self.ids)
+            self.ids.append(track_id)
+            self.neighbours.append(array("I"))
+            self.counts.append(array("I"))
+            self.totals.append(0)
+        return i
+
+    def add(self, previous, current):
+        """Records that `current` was played (and not skipped) right after `previous`."""
+        if previous == current:
+            return
+        a, b = self._id(previous), self._id(current)
+        neighbours, counts = self.neighbours[a], self.counts[a]
+        try:
+            pos = neighbours.index(b)
+            counts[pos] += 1
+        except ValueError:
+            if len(neighbours) < MAX_NEIGHBOURS:
+                neighbours.append(b)
+                counts.append(1)
+            else:
+                # Full: the new link replaces the weakest one
+                pos = counts.index(min(counts))
+                self.totals[a] -= counts[pos]
+                neighbours[pos] = b
+                counts[pos] = 1
+        self.totals[a] += 1
+
+    def recommend(self, recent, exclude=(), limit=1):
+        """Best next track ids after `recent` (most recent last), skipping anything in `exclude`."""
+        scores = {}
+        for weight, track_id in zip(RECENT_WEIGHTS, reversed(recent)):
+            a = self.lookup.get(track_id)
+            if a is None or not self.totals[a]:
+                continue
+            scale = weight / self.totals[a]
+            for b, count in zip(self.neighbours[a], self.counts[a]):
+                scores[b] = scores.get(b, 0.0) + count * scale
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        result = []
+        for b in ranked:
+            track_id = self.ids[b]
+            if track_id not in exclude:
+                result.append(track_id)
+                if len(result) == limit:
+                    break
+        return result
+
+    def train(self, sequences):
+        """Builds links from (guild_id, track_id) rows ordered by guild, then time."""
+        last_guild = previous = None
+        for guild_id, track_id in sequences:
+            if guild_id == last_guild and previous is not None:
+                self.add(previous, track_id)
+            last_guild, previous = guild_id, track_id
+
+    def __len__(self):
+        return len(self.ids)
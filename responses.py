@@ -0,0 +1,29 @@
+import discord
+from core import create_embed
+
+# Prebuilt static responses. Built once at import instead of on every command;
+# these Embed objects are shared, so send them as-is and use `.copy()` if you
+# ever need to change one.
+
+# Voice / music
+JOIN_VOICE_FIRST = create_embed("Error", "You need to join a voice channel first!", discord.Color.red())
+CONNECTION_TIMEOUT = create_embed("Connection Timeout", "Unable to connect to the voice channel. Please try again later.", discord.Color.red())
+NOT_CONNECTED = create_embed("Error", "I'm not connected to any voice channel.", discord.Color.red())
+NOT_CONNECTED_JOIN_FIRST = create_embed("Error", "I'm not connected to a voice channel! Join one first.", discord.Color.red())
+BOT_NOT_IN_VOICE = create_embed("Error", "The bot is not in a voice channel.", discord.Color.red())
+INVALID_VOLUME = create_embed("Invalid Volume", "Please provide a volume level between 0 and 100.", discord.Color.orange())
+NOTHING_PLAYING = create_embed("Error", "Nothing is playing.", discord.Color.red())
+NOTHING_TO_SKIP = create_embed("Nothing Playing", "There are no tracks to skip.", discord.Color.orange())
+ALREADY_PAUSED = create_embed("Error", "Music is already paused.", discord.Color.red())
+NOT_PAUSED = create_embed("Error", "Music is not paused.", discord.Color.red())
+QUEUE_EMPTY = create_embed("Queue Empty", "The queue is currently empty.", discord.Color.orange())
+SKIPPED = create_embed("Skipped", "⏭️ The current track has been skipped.")
+PAUSED = create_embed("Paused", "⏸️ Music has been paused.")
+RESUMED = create_embed("Resumed", "▶️ Music has been resumed.")
+STOPPED = create_embed("Stopped", "⏹️ Music has been stopped and the queue has been cleared.", discord.Color.blue())
+LEFT_VOICE = create_embed("Disconnected", "👋 Left the voice channel.", discord.Color.blue())
+QUEUE_ENDED = create_embed("Disconnected", "Queue ended, leaving voice channel after 10 seconds of inactivity.", discord.Color.blue())
+
+# AI channel setup
+AI_SETUP_COMPLETE = create_embed("AI Setup Complete", "✅ This channel has been successfully configured for AI responses. I will now respond to messages in this channel.", discord.Color.green())
+AI_REMOVED = create_embed("AI Removed", "❌ AI interaction has been disabled for this guild.", discord.Color.red())
@@ -0,0 +1,225 @@
+import time
+import asyncio
+import logging
+import contextlib
+import contextvars
+import aiohttp
+
+# Discord REST telemetry and request priorities. discord.py's HTTPClient
+# already waits out per-route buckets; this wraps `bot.http.request` to
+# record, per route, how many requests were sent, how many came back 429 and
+# how long callers spent waiting (in discord.py's rate limiter and on
+# retries) on top of the HTTP round trips themselves. Response headers are
+# read through an aiohttp trace on discord.py's own session, so every retry
+# is seen.
+#
+# Requests also carry a priority, set with `rest_priority(...)` around the
+# calls. Cosmetic requests (music controller and poll message edits) are held
+# back, for at most MAX_COSMETIC_DELAY seconds, while critical ones (automod,
+# anti-nuke, raid and mass moderation) are in flight or while their own bucket
+# is down to its last COSMETIC_RESERVE share of requests, so moderation gets
+# the remaining capacity first.
+
+logger = logging.getLogger(__name__)
+
+CRITICAL, NORMAL, COSMETIC = 0, 1, 2
+PRIORITY_NAMES = {CRITICAL: "critical", NORMAL: "normal", COSMETIC: "cosmetic"}
+MAX_COSMETIC_DELAY = 5.0
+COSMETIC_RESERVE = 0.25 # share of a bucket kept free for other requests
+MAX_BUCKETS = 5000
+
+_priority = contextvars.ContextVar("rest_priority", default=NORMAL)
+_current_call = contextvars.ContextVar("rest_call", default=None)
+
+@contextlib.contextmanager
+def rest_priority(level):
+    """Runs the REST requests made inside the block at `level` (CRITICAL, NORMAL or COSMETIC)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.attempts = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.held = 0
+        self.http_time = 0.0
+        self.wait_time = 0.0
+        self.min_remaining = None
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "cosmetic_held": self.held,
+            "avg_http_ms": round(self.http_time / self.attempts * 1000, 1) if self.attempts else 0,
+            "wait_s": round(self.wait_time, 2),
+            "min_remaining": self.min_remaining,
+        }
+
+class Bucket:
+    __slots__ = ("limit", "remaining", "reset_at")
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+
+    def nearly_exhausted(self, now):
+        if self.limit is None or self.reset_at <= now:
+            return False
+        return self.remaining <= max(1, int(self.limit * COSMETIC_RESERVE))
+
+class Call:
+    __slots__ = ("stats", "bucket", "http_time")
+
+    def __init__(self, stats, bucket):
+        self.stats = stats
+        self.bucket = bucket
+        self.http_time = 0.0
+
+class RestMonitor:
+    def __init__(self):
+        self.routes = {} # route key ("PATCH /channels/{channel_id}/messages/{message_id}") -> RouteStats
+        self.buckets = {} # route key + major parameters -> Bucket
+        self.by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.global_rate_limited = 0
+        self.shared_rate_limited = 0
+        self._critical = 0
+        self._critical_idle = asyncio.Event()
+        self._critical_idle.set()
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_request_end.append(self._on_request_end)
+        self.trace_config.on_request_exception.append(self._on_request_exception)
+
+    def install(self, http):
+        """Wraps an HTTPClient's `request`; the client must have been created with `http_trace=self.trace_config`."""
+        original = http.request
+
+        async def request(route, **kwargs):
+            return await self._request(original, route, **kwargs)
+        http.request = request
+
+    def _bucket(self, route):
+        key = f"{route.key}:{route.major_parameters}"
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= MAX_BUCKETS:
+                now = time.monotonic()
+                self.buckets = {k: b for k, b in self.buckets.items() if b.reset_at > now}
+            bucket = self.buckets[key] = Bucket()
+        return bucket
+
+    async def _request(self, original, route, **kwargs):
+        stats = self.routes.get(route.key)
+        if stats is None:
+            stats = self.routes[route.key] = RouteStats()
+        bucket = self._bucket(route)
+        priority = _priority.get()
+        self.by_priority[PRIORITY_NAMES[priority]] += 1
+        stats.requests += 1
+
+        if priority == COSMETIC:
+            await self._hold_cosmetic(bucket, stats)
+        elif priority == CRITICAL:
+            self._critical += 1
+            self._critical_idle.clear()
+
+        call = Call(stats, bucket)
+        token = _current_call.set(call)
+        start = time.monotonic()
+        try:
+            return await original(route, **kwargs)
+        finally:
+            _current_call.reset(token)
+            stats.wait_time += max(0.0, time.monotonic() - start - call.http_time)
+            if priority == CRITICAL:
+                self._critical -= 1
+                if not self._critical:
+                    self._critical_idle.set()
+
+    async def _hold_cosmetic(self, bucket, stats):
+        start = time.monotonic()
+        deadline = start + MAX_COSMETIC_DELAY
+        held = False
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if self._critical:
+                held = True
+                try:
+                    await asyncio.wait_for(self._critical_idle.wait(), deadline - now)
+                except asyncio.TimeoutError:
+                    break
+            elif bucket.nearly_exhausted(now):
+                held = True
+                await asyncio.sleep(min(bucket.reset_at, deadline) - now)
+            else:
+                break
+        if held:
+            stats.held += 1
+            stats.wait_time += time.monotonic() - start
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.start = time.monotonic()
+
+    async def _on_request_end(self, session, ctx, params):
+        call = _current_call.get()
+        if call is None:
+            return # not a REST call made through bot.http (e.g. the gateway)
+        stats, bucket = call.stats, call.bucket
+        elapsed = time.monotonic() - ctx.start
+        call.http_time += elapsed
+        stats.http_time += elapsed
+        stats.attempts += 1
+
+        response = params.response
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            try:
+                bucket.remaining = int(remaining)
+                bucket.limit = int(headers.get("X-RateLimit-Limit", bucket.limit or 1))
+                bucket.reset_at = time.monotonic() + float(headers.get("X-RateLimit-Reset-After", 0))
+            except ValueError:
+                pass
+            else:
+                if stats.min_remaining is None or bucket.remaining < stats.min_remaining:
+                    stats.min_remaining = bucket.remaining
+
+        if response.status == 429:
+            stats.rate_limited += 1
+            scope = headers.get("X-RateLimit-Scope")
+            if scope == "global" or headers.get("X-RateLimit-Global"):
+                self.global_rate_limited += 1
+            elif scope == "shared":
+                self.shared_rate_limited += 1
+        elif response.status >= 400:
+            stats.errors += 1
+
+    async def _on_request_exception(self, session, ctx, params):
+        call = _current_call.get()
+        if call is not None:
+            call.http_time += time.monotonic() - ctx.start
+            call.stats.errors += 1
+
+    def as_dict(self, limit=25):
+        routes = sorted(self.routes.items(), key=lambda item: (item[1].rate_limited, item[1].requests), reverse=True)
+        return {
+            "requests": sum(s.requests for s in self.routes.values()),
+            "rate_limited": sum(s.rate_limited for s in self.routes.values()),
+            "global_rate_limited": self.global_rate_limited,
+            "shared_rate_limited": self.shared_rate_limited,
+            "wait_s": round(sum(s.wait_time for s in self.routes.values()), 2),
+            "by_priority": self.by_priority,
+            "critical_in_flight": self._critical,
+            "routes": {key: stats.as_dict() for key, stats in routes[:limit]},
+        }
@@ -0,0 +1,115 @@
+import re
+import time
+import zlib
+import numpy as np
+
+# Semantic cache for AI answers. Prompts are embedded locally: character 3-
+# and 4-grams of the normalized text are hashed into a fixed-size vector,
+# which is L2-normalized. Entries live in one preallocated float32 matrix, so
+# a lookup is a single matrix-vector product (cosine similarity against every
+# cached prompt) and an argmax. The least recently used row is replaced once
+# the matrix is full.
+#
+# N-gram similarity can't tell "best" from "worst" or 13 from 14 once a
+# prompt is more than a few words long, so a hit also needs the same key
+# words: every word except filler (see STOPWORDS), with numbers and negations
+# always counting. The embedding then only absorbs case, punctuation, filler
+# and word order. Entries are scoped (per guild), and prompts longer than
+# MAX_PROMPT_CHARS are never cached.
+
+DIMENSIONS = 1024
+NGRAM_SIZES = (3, 4)
+MAX_PROMPT_CHARS = 200
+WORD_PATTERN = re.compile(r"[^\w\s]+")
+TOKEN_PATTERN = re.compile(r"\w+")
+# Filler that doesn't change what is being asked. Negations ("no", "not",
+# "never", ...) are deliberately absent.
+STOPWORDS = frozenset("""
+a an the and or so to of in on at for with from by about as into
+i me my we our you your it its this that these those there here
+is am are was were be been being do does did doing have has had
+can could would should will shall may might must
+please pls plz hey hi hello thanks thank just really some any
+""".split())
+
+def key_words(text):
+    """The words of `text` that must match exactly for a cache hit (order-insensitive)."""
+    text = text.lower().replace("n't", " not").replace("’", "'")
+    return frozenset(w for w in TOKEN_PATTERN.findall(text) if w not in STOPWORDS)
+
+def embed(text, dimensions=DIMENSIONS):
+    text = " " + " ".join(WORD_PATTERN.sub(" ", text.lower()).split()) + " "
+    data = text.encode()
+    indices = [
+        zlib.crc32(data[i:i + n]) % dimensions
+        for n in NGRAM_SIZES for i in range(len(data) - n + 1)
+    ]
+    vector = np.bincount(indices, minlength=dimensions).astype(np.float32) if indices else np.zeros(dimensions, np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class SemanticCache:
+    def __init__(self, threshold=0.92, maxsize=1024, ttl=24 * 3600, dimensions=DIMENSIONS):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.dimensions = dimensions
+        self.vectors = np.zeros((maxsize, dimensions), np.float32)
+        self.answers = [None] * maxsize
+        self.expires = np.zeros(maxsize)
+        self.last_used = np.zeros(maxsize)
+        self.scopes = np.zeros(maxsize, np.int64)
+        self.signatures = np.zeros(maxsize, np.int64)
+        self.size = 0
+        self.lookups = 0
+        self.hits = 0
+        self.hit_similarity = 0.0
+
+    @staticmethod
+    def cacheable(prompt):
+        return len(prompt) <= MAX_PROMPT_CHARS
+
+    def get(self, prompt, scope=0):
+        """The cached answer for the most similar prompt in `scope` with the same key words, if it is at least `threshold` similar and not expired."""
+        self.lookups += 1
+        if not self.size or not self.cacheable(prompt):
+            return None
+        now = time.monotonic()
+        sims = self.vectors[:self.size] @ embed(prompt, self.dimensions)
+        sims[(self.expires[:self.size] < now)
+             | (self.scopes[:self.size] != scope)
+             | (self.signatures[:self.size] != hash(key_words(prompt)))] = -1
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        self.hits += 1
+        self.hit_similarity += float(sims[best])
+        self.last_used[best] = now
+        return self.answers[best]
+
+    def set(self, prompt, answer, scope=0):
+        if not self.cacheable(prompt):
+            return
+        now = time.monotonic()
+        if self.size < self.maxsize:
+            slot = self.size
+            self.size += 1
+        else:
+            # Expired rows have last_used pushed to 0 so they go first
+            slot = int(np.argmin(np.where(self.expires < now, 0, self.last_used)))
+        self.vectors[slot] = embed(prompt, self.dimensions)
+        self.answers[slot] = answer
+        self.scopes[slot] = scope
+        self.signatures[slot] = hash(key_words(prompt))
+        self.expires[slot] = now + self.ttl
+        self.last_used[slot] = now
+
+    def as_dict(self):
+        return {
+            "entries": self.size,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else None,
+            "avg_hit_similarity": round(self.hit_similarity / self.hits, 3) if self.hits else None,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+
+# Base for the bot's local SQLite stores (moderation log, listening
+# history, polls). Callers append rows with `_enqueue`, which never
+# blocks; a background task hands the buffered rows to `_write_batch` from a
+# worker thread every `flush_interval` seconds or once `batch_size` rows are
+# waiting, so the event loop never waits on disk.
+
+logger = logging.getLogger(__name__)
+
+class SQLiteStore:
+    schema = ""
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._wakeup = None
+        self._writer = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.schema)
+            conn.row_factory = sqlite3.Row
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, fn):
+        # One connection shared by the writer and readers; WAL keeps reads cheap
+        with self._lock:
+            return fn(self._connect())
+
+    async def _read(self, sql, params=(), one=False):
+        def run(conn):
+            cursor = conn.execute(sql, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+        return await asyncio.to_thread(self._execute, run)
+
+    def _enqueue(self, row):
+        self._buffer.append(row)
+        if self._writer is None or self._writer.done():
+            self._wakeup = asyncio.Event()
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _write_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _write_batch(self, conn, batch):
+        raise NotImplementedError
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+
+        def write(conn):
+            with conn:
+                self._write_batch(conn, batch)
+        try:
+            await asyncio.to_thread(self._execute, write)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} row(s) to {self.path}: {e}")
+
+    async def close(self):
+        if self._writer:
+            self._writer.cancel()
+        await self.flush()
+        if self._conn:
+            self._execute(lambda conn: conn.close())
+            self._conn = None
@@ -0,0 +1,34 @@
+import time
+
+# Startup timing. Imported first thing in main.py (before discord or any
+# feature module) so the report covers the whole path from process start to
+# on_ready. Deliberately stdlib-only.
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.steps = []
+        self.reported = False
+
+    def mark(self, name):
+        """Records how long it took to reach `name` since the previous mark."""
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last))
+        self.last = now
+
+    def record(self, name, seconds):
+        # For sub-steps timed by the caller (e.g. individual feature modules)
+        self.steps.append((name, seconds))
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def as_dict(self):
+        return {name: round(seconds * 1000, 1) for name, seconds in self.steps}
+
+    def report(self):
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.steps]
+        return f"Startup: {self.elapsed():.2f}s total | " + " | ".join(parts)
+
+timer = StartupTimer()
@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import subprocess
+import urllib.request
+from log_setup import setup_logging
+
+# Shard supervisor: splits the bot's shards across several worker processes
+# (one `python main.py` per range) so message handling can use every core.
+#
+#   SHARD_COUNT        total shards (default: Discord's recommended count)
+#   SHARD_WORKERS      number of worker processes (default: CPU count)
+#   PORT               keep-alive port of worker 0, worker N listens on PORT + N
+#   SHARD_SPAWN_DELAY  seconds between worker starts, to respect the identify limit
+#
+# All workers share the same environment and the same JSON config files.
+
+setup_logging("supervisor")
+logger = logging.getLogger(__name__)
+
+RESTART_BACKOFF_MAX = 60
+
+def fetch_recommended_shards(token):
+    request = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (supervisor, 1.0)"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as resp:
+        data = json.load(resp)
+    return data["shards"]
+
+def shard_ranges(total_shards, workers):
+    """Splits shard IDs 0..total_shards-1 into `workers` contiguous, balanced ranges."""
+    workers = max(1, min(workers, total_shards))
+    base, extra = divmod(total_shards, workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        size = base + (1 if i < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+class Worker:
+    def __init__(self, index, shard_ids, total_shards, port):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.total_shards = total_shards
+        self.port = port
+        self.process = None
+        self.restarts = 0
+        self.next_start = 0.0
+        self.started_at = 0.0
+
+    def start(self):
+        env = os.environ.copy()
+        env.update({
+            "SHARD_COUNT": str(self.total_shards),
+            "SHARD_IDS": ",".join(str(i) for i in self.shard_ids),
+            "SHARD_WORKER": str(self.index),
+            "PORT": str(self.port),
+        })
+        logger.info(f"Starting worker {self.index} (shards {self.shard_ids[0]}-{self.shard_ids[-1]}, port {self.port})")
+        self.process = subprocess.Popen([sys.executable, "main.py"], env=env)
+        self.started_at = time.monotonic()
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+def main():
+    token = os.environ.get('DISCORD_TOKEN')
+    if not token:
+        logger.error("Missing DISCORD_TOKEN")
+        sys.exit(1)
+
+    total_shards = os.environ.get('SHARD_COUNT')
+    if total_shards:
+        total_shards = int(total_shards)
+    else:
+        try:
+            total_shards = fetch_recommended_shards(token)
+            logger.info(f"Discord recommends {total_shards} shard(s)")
+        except Exception as e:
+            logger.error(f"Could not fetch recommended shard count, falling back to 1: {e}")
+            total_shards = 1
+
+    workers_count = int(os.environ.get('SHARD_WORKERS', os.cpu_count() or 1))
+    base_port = int(os.environ.get('PORT', 5000))
+    spawn_delay = float(os.environ.get('SHARD_SPAWN_DELAY', 5))
+
+    workers = [
+        Worker(i, ids, total_shards, base_port + i)
+        for i, ids in enumerate(shard_ranges(total_shards, workers_count))
+    ]
+
+    stopping = False
+
+    def handle_signal(signum, frame):
+        nonlocal stopping
+        stopping = True
+        logger.info("Shutting down workers...")
+        for worker in workers:
+            worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    for i, worker in enumerate(workers):
+        if stopping:
+            break
+        if i:
+            time.sleep(spawn_delay)
+        worker.start()
+
+    while not stopping:
+        time.sleep(1)
+        now = time.monotonic()
+        for worker in workers:
+            code = worker.process.poll() if worker.process else None
+            if worker.process and code is not None:
+                # Crashed: back off exponentially so a bad token doesn't spin the CPU
+                if now - worker.started_at > 300:
+                    worker.restarts = 0
+                worker.restarts += 1
+                delay = min(RESTART_BACKOFF_MAX, 2 ** worker.restarts)
+                logger.warning(f"Worker {worker.index} exited with code {code}, restarting in {delay}s")
+                worker.process = None
+                worker.next_start = now + delay
+            elif worker.process is None and now >= worker.next_start:
+                worker.start()
+
+    for worker in workers:
+        if worker.process:
+            try:
+                worker.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from semantic_cache import SemanticCache, MAX_PROMPT_CHARS
+
+# Prompts that look alike to the n-gram embedding but need different answers
+DIFFERENT = [
+    ("am I allowed to post links here", "am I not allowed to post links here"),
+    ("what is 12 times 13", "what is 12 times 14"),
+    ("who is the best guitarist", "who is the worst guitarist"),
+    ("can you explain how the queue works when several people add songs in a voice channel",
+     "can you explain how the queue works when several people add songs in a text channel"),
+    ("what's the best way to set up automod so spammers get timed out",
+     "what's the best way to set up automod so spammers get banned"),
+    ("do I need a role to use the bot", "don't I need a role to use the bot"),
+]
+
+# Rewordings that should reuse the cached answer
+SAME = [
+    ("how do I play music?", "how do i play music"),
+    ("How do I play music??", "how do I play music"),
+    ("how do I skip a song", "how do I skip a song?"),
+    ("hello", "hello!"),
+]
+
+def test_different_prompts_miss():
+    for cached, asked in DIFFERENT:
+        cache = SemanticCache()
+        cache.set(cached, "answer")
+        assert cache.get(asked) is None, (cached, asked)
+
+def test_rewordings_hit():
+    for cached, asked in SAME:
+        cache = SemanticCache()
+        cache.set(cached, "answer")
+        assert cache.get(asked) == "answer", (cached, asked)
+
+def test_scopes_are_separate():
+    cache = SemanticCache()
+    cache.set("how do I play music", "guild 1 answer", scope=1)
+    assert cache.get("how do I play music", scope=2) is None
+    assert cache.get("how do I play music", scope=1) == "guild 1 answer"
+
+def test_long_prompts_are_not_cached():
+    prompt = "tell me about music " * (MAX_PROMPT_CHARS // 10)
+    cache = SemanticCache()
+    cache.set(prompt, "answer")
+    assert cache.get(prompt) is None
@@ -0,0 +1,86 @@
+import re
+import time
+from bisect import bisect_left, insort
+
+# Prefix index of played track titles for /play autocomplete. Every played
+# track is indexed under each word of "title author", so "gonna" finds
+# "Never Gonna Give You Up". Keys live in one sorted list and a query is a
+# bisect plus a short scan, so suggestions come from memory with no Lavalink
+# round trip. New tracks are insorted; when the index is full the least
+# played tenth is dropped and the list rebuilt in one pass.
+#
+# Each entry keeps the track's raw Lavalink payload, so a picked suggestion
+# is played as that exact track without searching again.
+
+MAX_WORDS = 8
+SCAN_LIMIT = 200
+WORD_PATTERN = re.compile(r"\w+")
+
+def index_words(text):
+    return WORD_PATTERN.findall(text.lower())[:MAX_WORDS]
+
+class TrackEntry:
+    __slots__ = ("key", "label", "raw", "plays", "last_played")
+
+    def __init__(self, key, label, raw):
+        self.key = key
+        self.label = label
+        self.raw = raw
+        self.plays = 0
+        self.last_played = 0.0
+
+class TrackIndex:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = {} # key -> TrackEntry
+        self._keys = [] # sorted (suffix text, key)
+
+    def add(self, key, label, raw, now=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.maxsize:
+                self._evict()
+            entry = self.entries[key] = TrackEntry(key, label, raw)
+            words = index_words(label)
+            for i in range(len(words)):
+                insort(self._keys, (" ".join(words[i:]), key))
+        entry.plays += 1
+        entry.last_played = now or time.time()
+        return entry
+
+    def _evict(self):
+        # Drop the least played tenth (oldest on ties) in one go, so the
+        # sort and key rebuild happen once per maxsize/10 new tracks
+        keep = sorted(self.entries.values(), key=lambda e: (e.plays, e.last_played))[self.maxsize // 10 + 1:]
+        self.entries = {e.key: e for e in keep}
+        self._rebuild()
+
+    def _rebuild(self):
+        keys = []
+        for entry in self.entries.values():
+            words = index_words(entry.label)
+            for i in range(len(words)):
+                keys.append((" ".join(words[i:]), entry.key))
+        keys.sort()
+        self._keys = keys
+
+    def search(self, prefix, limit=25):
+        """Entries with a word starting with `prefix`, most played (then most recent) first."""
+        prefix = " ".join(index_words(prefix))
+        if not prefix:
+            found = list(self.entries.values())
+        else:
+            found = {}
+            i = bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(found) < SCAN_LIMIT:
+                text, key = self._keys[i]
+                if not text.startswith(prefix):
+                    break
+                found[key] = self.entries[key]
+                i += 1
+            found = list(found.values())
+        found.sort(key=lambda e: (-e.plays, -e.last_played))
+        return found[:limit]
+
+    def __len__(self):
+        return len(self.entries)
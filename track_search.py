@@ -0,0 +1,115 @@
+import os
+import time
+import asyncio
+import logging
+import yarl
+import wavelink
+
+# Hedged track search. A text query goes to several Lavalink search sources:
+# the best-ranked source starts at once and each next one after a short
+# stagger (or immediately when an earlier one fails). The first non-empty
+# result wins and the other requests are cancelled. Every finished request
+# updates its source's success rate and latency average, and sources are
+# re-ranked on each search, so the fastest reliable source ends up first.
+# URLs skip all of this and are loaded directly.
+#
+#   SEARCH_SOURCES   comma separated search prefixes (default ytmsearch,ytsearch,scsearch)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCES = "ytmsearch,ytsearch,scsearch"
+SEARCH_DEADLINE = 8.0
+HEDGE_DELAY = 0.4
+LATENCY_WEIGHT = 0.2 # EWMA smoothing for latency
+
+class SourceStats:
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.wins = 0
+        self.latency = None # EWMA seconds of finished requests
+
+    def record(self, seconds, success):
+        self.attempts += 1
+        self.successes += success
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_WEIGHT * (seconds - self.latency)
+
+    def record_lost(self, seconds):
+        # Cancelled after losing the race: its latency is at least `seconds`
+        if self.latency is None or seconds > self.latency:
+            self.latency = seconds if self.latency is None else self.latency + LATENCY_WEIGHT * (seconds - self.latency)
+
+    @property
+    def score(self):
+        # Smoothed success rate per second of latency. The hedge delay is added
+        # so a source that fails quickly can't outrank one that actually answers.
+        rate = (self.successes + 1) / (self.attempts + 2)
+        return rate / ((self.latency if self.latency is not None else 1.0) + HEDGE_DELAY)
+
+    def as_dict(self):
+        return {
+            "attempts": self.attempts,
+            "success_rate": round(self.successes / self.attempts, 3) if self.attempts else None,
+            "wins": self.wins,
+            "latency_ms": round(self.latency * 1000) if self.latency is not None else None,
+        }
+
+class HedgedSearch:
+    def __init__(self, sources=None, deadline=SEARCH_DEADLINE, hedge_delay=HEDGE_DELAY):
+        sources = sources or os.environ.get("SEARCH_SOURCES", DEFAULT_SOURCES).split(",")
+        self.stats = {s.strip(): SourceStats() for s in sources if s.strip()}
+        self.deadline = deadline
+        self.hedge_delay = hedge_delay
+
+    def ranked(self):
+        # Stable sort keeps the configured order until there is data
+        return sorted(self.stats, key=lambda s: self.stats[s].score, reverse=True)
+
+    async def _search(self, query, source):
+        start = time.perf_counter()
+        try:
+            result = await wavelink.Playable.search(query, source=source)
+        except asyncio.CancelledError:
+            self.stats[source].record_lost(time.perf_counter() - start)
+            raise
+        except Exception as e:
+            logger.debug(f"Search on {source} failed: {e}")
+            result = None
+        self.stats[source].record(time.perf_counter() - start, bool(result))
+        return source, result
+
+    async def search(self, query):
+        """Returns the first non-empty search result (list of tracks or a playlist), or [] if none arrives in time."""
+        if yarl.URL(query).host:
+            return await wavelink.Playable.search(query)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        pending = set()
+        waiting = self.ranked()
+        try:
+            while waiting or pending:
+                if waiting:
+                    pending.add(asyncio.create_task(self._search(query, waiting.pop(0))))
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # Give the running requests a head start before hedging with the next source
+                timeout = min(self.hedge_delay, remaining) if waiting else remaining
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source, result = task.result()
+                    if result:
+                        self.stats[source].wins += 1
+                        return result
+            logger.info(f"No search source returned results for {query!r}")
+            return []
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def as_dict(self):
+        return {source: self.stats[source].as_dict() for source in self.ranked()}